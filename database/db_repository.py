@@ -1,10 +1,114 @@
 import sqlite3
+import threading
+import weakref
+from database import rollups
+
+# Applied to every new connection. WAL lets dashboard reads run while a
+# snapshot write is in progress; synchronous=NORMAL is durable in WAL mode
+# except for the last transactions on power loss, and skips an fsync per commit.
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,       # negative = KiB, i.e. 16 MB page cache per connection
+    'mmap_size': 268435456,     # 256 MB memory-mapped reads
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,       # ms to wait for a writer instead of "database is locked"
+}
+
+
+class _ThreadConnection:
+    """Holds one thread's connection; closes it when the thread's local storage is dropped."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __del__(self):
+        if self.conn is not None:
+            self.conn.close()
+
+
+class ConnectionPool:
+    """
+    Per-thread SQLite connections.
+
+    sqlite3 connections must not be used from two threads at once, so every
+    thread gets its own, kept in thread-local storage. It is closed when the
+    thread exits, or returned with release() so another thread can reuse it.
+    A connection is never handed on while its thread may still use it.
+    """
+
+    def __init__(self, db_path, pragmas=PRAGMAS):
+        self.db_path = db_path
+        self.pragmas = pragmas
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._holders = weakref.WeakSet()  # every connection handed out, for close_all()
+        self._idle = []
+
+    def _connect(self):
+        # Released connections move between threads, one thread at a time
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def connection(self):
+        """Get the calling thread's connection, opening or reusing one if needed."""
+        holder = getattr(self._local, 'holder', None)
+        if holder is not None and holder.conn is not None:
+            return holder.conn
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+        holder = _ThreadConnection(conn)
+        self._local.holder = holder
+        with self._lock:
+            self._holders.add(holder)
+        return conn
+
+    def release(self):
+        """Return the calling thread's connection to the pool (e.g. before a worker thread exits)."""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None or holder.conn is None:
+            return
+        self._local.holder = None
+        conn, holder.conn = holder.conn, None
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self._holders.discard(holder)
+            self._idle.append(conn)
+
+    def close_all(self):
+        with self._lock:
+            holders = list(self._holders)
+            idle = self._idle
+            self._holders = weakref.WeakSet()
+            self._idle = []
+        for holder in holders:
+            conn, holder.conn = holder.conn, None
+            if conn is not None:
+                conn.close()
+        for conn in idle:
+            conn.close()
 
 
 class Database:
     def __init__(self, db_path="./database/eduvisiondb.db"):
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path)
+        # Open the first connection now so WAL mode is set before any thread starts
+        self.pool.connection()
+        if rollups.ensure_rollup_tables(self.conn):
+            # Tables are new; aggregate the snapshots recorded before them
+            rollups.backfill_rollups(self.conn)
+
+    @property
+    def conn(self):
+        """Connection of the calling thread."""
+        return self.pool.connection()
 
     def get_buildings(self):
         cursor = self.conn.cursor()
@@ -43,10 +147,69 @@ class Database:
         )
         self.conn.commit()
 
+    def save_snapshots(self, snapshots):
+        cursor = self.conn.cursor()  # snapshots: iterable of (room_id, timestamp, count)
+        cursor.executemany(
+            "INSERT INTO raw_data (room_id, timestamp, room_count) VALUES (?, ?, ?)",
+            snapshots
+        )
+        self.conn.commit()
+        return cursor.rowcount
+
+    def get_occupancy(self, room_id, start=None, end=None, granularity='hour'):
+        """
+        Occupancy statistics of a room per time bucket, read from the rollup tables.
+
+        Args:
+            room_id: Room to query
+            start: First bucket_start to include ("%Y-%m-%d %H:%M:%S"), None = no limit
+            end: Include buckets starting before this time, None = no limit
+            granularity: '5min', 'hour' or 'day'
+
+        Returns:
+            list of dicts with bucket_start, min_count, max_count, avg_count, sample_count
+        """
+        table = rollups.rollup_table(granularity)
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""SELECT bucket_start, min_count, max_count,
+                       CAST(sum_count AS REAL) / sample_count AS avg_count, sample_count
+                FROM {table}
+                WHERE room_id = ? AND bucket_start >= ? AND bucket_start < ?
+                ORDER BY bucket_start""",
+            (room_id, start or '0000-00-00', end or '9999-12-31'))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_building_occupancy(self, building_id, start=None, end=None, granularity='day'):
+        """
+        Per-bucket occupancy of every room in a building.
+
+        Returns:
+            list of dicts with room_id, number, bucket_start, min_count, max_count, avg_count, sample_count
+        """
+        table = rollups.rollup_table(granularity)
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""SELECT r.room_id, r.number, o.bucket_start, o.min_count, o.max_count,
+                       CAST(o.sum_count AS REAL) / o.sample_count AS avg_count, o.sample_count
+                FROM room r JOIN {table} o ON o.room_id = r.room_id
+                WHERE r.building_id = ? AND o.bucket_start >= ? AND o.bucket_start < ?
+                ORDER BY o.bucket_start, r.room_id""",
+            (building_id, start or '0000-00-00', end or '9999-12-31'))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def backfill_rollups(self, room_id=None):
+        """Rebuild the rollup tables from raw_data (after editing or deleting snapshots)."""
+        return rollups.backfill_rollups(self.conn, room_id)
+
     def get_all_course_names(self):
         cursor = self.conn.cursor()
         cursor.execute("SELECT name FROM course")
         return [row['name'] for row in cursor.fetchall()]
 
+    def release_connection(self):
+        """Give the calling thread's connection back to the pool."""
+        self.pool.release()
+
     def close(self):
-        self.conn.close()
+        self.pool.close_all()
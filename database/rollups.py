@@ -0,0 +1,133 @@
+"""
+Pre-aggregated occupancy per room.
+
+raw_data keeps every snapshot; charts over weeks or a semester only need
+per-bucket statistics. For each granularity there is a rollup table holding
+min, max, sum and sample count of room_count per (room_id, bucket_start):
+
+    5min   occupancy_5min
+    hour   occupancy_hourly
+    day    occupancy_daily
+
+AFTER INSERT triggers on raw_data update the three tables in the same
+transaction as the snapshot, so they are always current for new data.
+Updating or deleting raw_data rows is not tracked; run the backfill after
+such edits (or once for data that existed before the tables):
+
+    python -m database.rollups backfill [--room ROOM_ID] [--db PATH]
+"""
+import argparse
+import sqlite3
+import time
+
+# granularity -> (table, bucket_start expression over a timestamp column)
+GRANULARITIES = {
+    '5min': ('occupancy_5min',
+             "strftime('%Y-%m-%d %H:', {ts}) || printf('%02d:00', CAST(strftime('%M', {ts}) AS INTEGER) / 5 * 5)"),
+    'hour': ('occupancy_hourly', "strftime('%Y-%m-%d %H:00:00', {ts})"),
+    'day': ('occupancy_daily', "strftime('%Y-%m-%d 00:00:00', {ts})"),
+}
+
+
+def _table_sql(table):
+    return f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    room_id INTEGER NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    min_count INTEGER NOT NULL,
+    max_count INTEGER NOT NULL,
+    sum_count INTEGER NOT NULL,
+    sample_count INTEGER NOT NULL,
+    PRIMARY KEY (room_id, bucket_start)
+) WITHOUT ROWID;
+"""
+
+
+def _trigger_sql(granularity, table, bucket):
+    bucket = bucket.format(ts='NEW.timestamp')
+    return f"""
+CREATE TRIGGER IF NOT EXISTS trg_rawdata_rollup_{granularity}
+AFTER INSERT ON raw_data
+BEGIN
+    INSERT INTO {table} (room_id, bucket_start, min_count, max_count, sum_count, sample_count)
+    VALUES (NEW.room_id, {bucket}, NEW.room_count, NEW.room_count, NEW.room_count, 1)
+    ON CONFLICT (room_id, bucket_start) DO UPDATE SET
+        min_count = MIN(min_count, excluded.min_count),
+        max_count = MAX(max_count, excluded.max_count),
+        sum_count = sum_count + excluded.sum_count,
+        sample_count = sample_count + 1;
+END;
+"""
+
+
+ROLLUP_SCHEMA = "".join(_table_sql(table) + _trigger_sql(granularity, table, bucket)
+                        for granularity, (table, bucket) in GRANULARITIES.items())
+
+
+def rollup_table(granularity):
+    """Table name for a granularity ('5min', 'hour' or 'day')."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}, expected one of {list(GRANULARITIES)}")
+    return GRANULARITIES[granularity][0]
+
+
+def ensure_rollup_tables(conn):
+    """
+    Create the rollup tables and triggers if missing.
+
+    Returns:
+        bool: True if the tables were created now (and still need a backfill)
+    """
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'raw_data' not in existing:
+        return False
+    created = any(table not in existing for table, _ in GRANULARITIES.values())
+    conn.executescript(ROLLUP_SCHEMA)
+    return created
+
+
+def backfill_rollups(conn, room_id=None):
+    """
+    Rebuild the rollup tables from raw_data in one transaction.
+
+    Args:
+        conn: sqlite3 connection
+        room_id: Only rebuild this room (None = all rooms)
+
+    Returns:
+        int: Number of raw_data rows aggregated
+    """
+    where = "WHERE room_id = ?" if room_id is not None else ""
+    params = (room_id,) if room_id is not None else ()
+    with conn:
+        for table, bucket in GRANULARITIES.values():
+            bucket = bucket.format(ts='timestamp')
+            conn.execute(f"DELETE FROM {table} {where}", params)
+            conn.execute(f"""
+                INSERT INTO {table} (room_id, bucket_start, min_count, max_count, sum_count, sample_count)
+                SELECT room_id, {bucket}, MIN(room_count), MAX(room_count), SUM(room_count), COUNT(*)
+                FROM raw_data {where}
+                GROUP BY room_id, {bucket}
+            """, params)
+        return conn.execute(f"SELECT COUNT(*) FROM raw_data {where}", params).fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the occupancy rollup tables")
+    parser.add_argument("command", choices=["backfill"], help="backfill: rebuild rollups from raw_data")
+    parser.add_argument("--room", type=int, default=None, help="Only rebuild this room_id")
+    parser.add_argument("--db", default="./database/eduvisiondb.db", help="SQLite database file")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        ensure_rollup_tables(conn)
+        start = time.perf_counter()
+        rows = backfill_rollups(conn, args.room)
+        print(f"Aggregated {rows} snapshots in {time.perf_counter() - start:.2f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
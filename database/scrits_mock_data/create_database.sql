@@ -98,3 +98,75 @@ CREATE INDEX IF NOT EXISTS idx_rawdata_room ON raw_data(room_id);
 CREATE INDEX IF NOT EXISTS idx_user_username ON user(username);
 CREATE INDEX IF NOT EXISTS idx_rawdata_timestamp ON raw_data(timestamp);
 CREATE INDEX IF NOT EXISTS idx_schedule_semester ON class_schedule(semester);
+
+-- ============================================
+-- OCCUPANCY ROLLUPS (kept in sync by database/rollups.py)
+-- ============================================
+-- Per-room min/max/sum/count of room_count in 5-minute, hourly and daily
+-- buckets, maintained by AFTER INSERT triggers on raw_data.
+
+CREATE TABLE IF NOT EXISTS occupancy_5min (
+    room_id INTEGER NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    min_count INTEGER NOT NULL,
+    max_count INTEGER NOT NULL,
+    sum_count INTEGER NOT NULL,
+    sample_count INTEGER NOT NULL,
+    PRIMARY KEY (room_id, bucket_start)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_rawdata_rollup_5min
+AFTER INSERT ON raw_data
+BEGIN
+    INSERT INTO occupancy_5min (room_id, bucket_start, min_count, max_count, sum_count, sample_count)
+    VALUES (NEW.room_id, strftime('%Y-%m-%d %H:', NEW.timestamp) || printf('%02d:00', CAST(strftime('%M', NEW.timestamp) AS INTEGER) / 5 * 5), NEW.room_count, NEW.room_count, NEW.room_count, 1)
+    ON CONFLICT (room_id, bucket_start) DO UPDATE SET
+        min_count = MIN(min_count, excluded.min_count),
+        max_count = MAX(max_count, excluded.max_count),
+        sum_count = sum_count + excluded.sum_count,
+        sample_count = sample_count + 1;
+END;
+
+CREATE TABLE IF NOT EXISTS occupancy_hourly (
+    room_id INTEGER NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    min_count INTEGER NOT NULL,
+    max_count INTEGER NOT NULL,
+    sum_count INTEGER NOT NULL,
+    sample_count INTEGER NOT NULL,
+    PRIMARY KEY (room_id, bucket_start)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_rawdata_rollup_hour
+AFTER INSERT ON raw_data
+BEGIN
+    INSERT INTO occupancy_hourly (room_id, bucket_start, min_count, max_count, sum_count, sample_count)
+    VALUES (NEW.room_id, strftime('%Y-%m-%d %H:00:00', NEW.timestamp), NEW.room_count, NEW.room_count, NEW.room_count, 1)
+    ON CONFLICT (room_id, bucket_start) DO UPDATE SET
+        min_count = MIN(min_count, excluded.min_count),
+        max_count = MAX(max_count, excluded.max_count),
+        sum_count = sum_count + excluded.sum_count,
+        sample_count = sample_count + 1;
+END;
+
+CREATE TABLE IF NOT EXISTS occupancy_daily (
+    room_id INTEGER NOT NULL,
+    bucket_start DATETIME NOT NULL,
+    min_count INTEGER NOT NULL,
+    max_count INTEGER NOT NULL,
+    sum_count INTEGER NOT NULL,
+    sample_count INTEGER NOT NULL,
+    PRIMARY KEY (room_id, bucket_start)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_rawdata_rollup_day
+AFTER INSERT ON raw_data
+BEGIN
+    INSERT INTO occupancy_daily (room_id, bucket_start, min_count, max_count, sum_count, sample_count)
+    VALUES (NEW.room_id, strftime('%Y-%m-%d 00:00:00', NEW.timestamp), NEW.room_count, NEW.room_count, NEW.room_count, 1)
+    ON CONFLICT (room_id, bucket_start) DO UPDATE SET
+        min_count = MIN(min_count, excluded.min_count),
+        max_count = MAX(max_count, excluded.max_count),
+        sum_count = sum_count + excluded.sum_count,
+        sample_count = sample_count + 1;
+END;
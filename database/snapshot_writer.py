@@ -0,0 +1,202 @@
+import queue
+import sqlite3
+import threading
+import time
+from database.db_repository import Database
+
+
+class SnapshotWriter:
+    """
+    Write-behind buffer for raw_data snapshots.
+
+    submit() only puts the row on a bounded queue and returns immediately.
+    A background thread owns its own database connection and drains the
+    queue in batches: one executemany() and one commit per batch, flushed
+    when batch_size rows are waiting or flush_interval seconds have passed
+    since the first of them arrived. When the queue is full, submit() waits
+    at most put_timeout seconds and then drops the row, counted in the
+    stats, so the caller never blocks on disk.
+    """
+
+    def __init__(self, db_path="./database/eduvisiondb.db", max_queue=10000, batch_size=500,
+                 flush_interval=2.0, put_timeout=0.0, max_retries=3):
+        """
+        Initialize the writer.
+
+        Args:
+            db_path: SQLite database file
+            max_queue: Maximum number of rows waiting to be written
+            batch_size: Rows written per transaction
+            flush_interval: Seconds a row may wait before its batch is written
+            put_timeout: Seconds submit() may wait for room in a full queue
+            max_retries: Attempts per batch before its rows are dropped
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.running = False
+        self.writer_thread = None
+
+        self._stats_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self.rows_submitted = 0
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.batches_written = 0
+        self.write_errors = 0
+        self.max_queue_depth = 0
+        self.last_batch_seconds = 0.0
+
+    def start(self):
+        """Start the writer thread."""
+        if not self.running:
+            self.running = True
+            self.writer_thread = threading.Thread(target=self._run_writer, name="snapshot-writer", daemon=True)
+            self.writer_thread.start()
+        return self
+
+    def submit(self, room_id, timestamp, count):
+        """
+        Queue one snapshot for writing.
+
+        Returns:
+            bool: False if the queue was full and the row was dropped
+        """
+        try:
+            if self.put_timeout > 0:
+                self.queue.put((room_id, timestamp, count), timeout=self.put_timeout)
+            else:
+                self.queue.put_nowait((room_id, timestamp, count))
+        except queue.Full:
+            with self._stats_lock:
+                self.rows_dropped += 1
+            return False
+        with self._stats_lock:
+            self.rows_submitted += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+        return True
+
+    def flush(self, timeout=10.0):
+        """
+        Write everything queued so far and wait for it.
+
+        Returns:
+            bool: True if the queue drained within the timeout
+        """
+        self._flush_requested.set()
+        deadline = time.time() + timeout
+        while self.queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.01)
+        return not self.queue.unfinished_tasks
+
+    def close(self, timeout=10.0):
+        """Flush pending rows and stop the writer thread."""
+        if not self.running:
+            return
+        self.flush(timeout)
+        self.running = False
+        self._flush_requested.set()
+        if self.writer_thread is not None:
+            self.writer_thread.join(timeout)
+            self.writer_thread = None
+
+    def _next_batch(self):
+        """Collect up to batch_size rows, waiting at most flush_interval after the first."""
+        try:
+            batch = [self.queue.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        deadline = time.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            if self._flush_requested.is_set():
+                # Take whatever is queued right now without waiting for more
+                try:
+                    batch.append(self.queue.get_nowait())
+                    continue
+                except queue.Empty:
+                    break
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=min(remaining, 0.2)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _write_batch(self, db, batch):
+        for attempt in range(1, self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                db.save_snapshots(batch)
+            except sqlite3.IntegrityError as e:
+                # A bad row fails the whole batch; retrying won't help, so write row by row
+                db.conn.rollback()
+                print(f"Invalid snapshot in batch, writing {len(batch)} rows individually: {e}")
+                self._write_rows(db, batch)
+                return
+            except Exception as e:
+                with self._stats_lock:
+                    self.write_errors += 1
+                print(f"Error writing {len(batch)} snapshots (attempt {attempt}): {e}")
+                db.conn.rollback()
+                time.sleep(0.5 * attempt)
+                continue
+            with self._stats_lock:
+                self.rows_written += len(batch)
+                self.batches_written += 1
+                self.last_batch_seconds = time.perf_counter() - start
+            return
+        with self._stats_lock:
+            self.rows_dropped += len(batch)
+
+    def _write_rows(self, db, rows):
+        written = 0
+        for row in rows:
+            try:
+                db.save_snapshot(*row)
+                written += 1
+            except sqlite3.IntegrityError:
+                db.conn.rollback()
+        with self._stats_lock:
+            self.rows_written += written
+            self.rows_dropped += len(rows) - written
+            self.write_errors += 1
+
+    def _run_writer(self):
+        """Main writer loop."""
+        # sqlite3 connections belong to the thread that opened them
+        db = Database(self.db_path)
+        try:
+            while self.running or not self.queue.empty():
+                batch = self._next_batch()
+                if not batch:
+                    self._flush_requested.clear()
+                    continue
+                try:
+                    self._write_batch(db, batch)
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+                if self.queue.empty():
+                    self._flush_requested.clear()
+        finally:
+            db.close()
+
+    def get_stats(self):
+        """Get throughput and backpressure counters."""
+        with self._stats_lock:
+            return {
+                'queued': self.queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'queue_capacity': self.queue.maxsize,
+                'rows_submitted': self.rows_submitted,
+                'rows_written': self.rows_written,
+                'rows_dropped': self.rows_dropped,
+                'batches_written': self.batches_written,
+                'write_errors': self.write_errors,
+                'last_batch_seconds': self.last_batch_seconds,
+            }
@@ -3,16 +3,36 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButt
 import PyQt5.QtCore as QtCore
 from PyQt5.QtGui import QImage, QPixmap, QFont, QPalette, QColor
 from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QRect
-import cv2
 from frontend.camera_thread import CameraThread
+from vision.inference_cadence import InferenceCadence
+from vision.motion_gate import MotionGate
+from vision.tracker import PersonTracker
+from vision.process_pool import ProcessInferencePool
+from frontend.frame_renderer import FrameRenderer
+from vision.telemetry import get_telemetry
 from datetime import datetime
+import time
 
 
 class CameraPage(QWidget):
-    def __init__(self, db, back_to_dashboard):
+    def __init__(self, db, back_to_dashboard, inference_workers=0, display_fps=15, snapshot_writer=None):
+        """
+        Args:
+            db: Database repository
+            back_to_dashboard: Callback to navigate back
+            inference_workers: Run detection in this many worker processes
+                               instead of the camera thread (0 = in-process)
+            display_fps: Maximum video refresh rate, independent of the camera rate
+            snapshot_writer: Optional SnapshotWriter; snapshots are queued to it
+                             instead of written on the GUI thread
+        """
         super().__init__()
         self.db = db
         self.back_to_dashboard = back_to_dashboard
+        self.inference_workers = inference_workers
+        self.display_fps = display_fps
+        self.snapshot_writer = snapshot_writer
+        self.inference_pool = None
         self.building_id = None
         self.room_id = None
         
@@ -23,6 +43,19 @@ class CameraPage(QWidget):
         self.camera_thread = None
         self.camera_running = False
         self.current_count = 0
+        self.smoothed_count = None
+        self.renderer = None
+        self.telemetry = get_telemetry()
+
+        # Paint the newest rendered frame at the display rate, not the camera rate
+        self.paint_timer = QtCore.QTimer(self)
+        self.paint_timer.timeout.connect(self.paint_frame)
+        self.paint_timer.start(int(1000 / display_fps))
+
+        # Refresh the latency breakdown once a second
+        self.telemetry_timer = QtCore.QTimer(self)
+        self.telemetry_timer.timeout.connect(self.update_telemetry)
+        self.telemetry_timer.start(1000)
 
         # --- Auto-start camera ---
         self.start_camera()
@@ -238,6 +271,20 @@ class CameraPage(QWidget):
         analytics_cards_layout.addWidget(self.status_card)
         
         section_layout.addLayout(analytics_cards_layout)
+        
+        # Pipeline latency card
+        self.telemetry_card = self.create_analytics_card("Latency p50 / p95 (ms)", "No samples yet", "#9c27b0")
+        self.telemetry_card.value_label.setStyleSheet("""
+            QLabel {
+                font-family: monospace;
+                font-size: 13px;
+                color: #ffffff;
+                background: transparent;
+                border: none;
+                padding: 5px;
+            }
+        """)
+        section_layout.addWidget(self.telemetry_card)
         section_layout.addStretch()
         
         return section_layout
@@ -450,9 +497,25 @@ class CameraPage(QWidget):
     # ---------------------
 
     def start_camera(self):
-        self.camera_thread = CameraThread()
-        self.camera_thread.frame_ready.connect(self.update_frame)
+        # Occupancy changes over seconds: cap inference and back off while stable
+        cadence = InferenceCadence(target_fps=5, adaptive=True)
+        if self.inference_workers > 0 and self.inference_pool is None:
+            self.inference_pool = ProcessInferencePool(num_workers=self.inference_workers)
+            self.inference_pool.start()
+        self.camera_thread = CameraThread(engine=self.inference_pool, cadence=cadence,
+                                          motion_gate=MotionGate(), tracker=PersonTracker())
+        if self.room_id is not None:
+            self.camera_thread.set_room(self.room_id)
+        # The page is built (and counting starts) long before it is first shown;
+        # showEvent/hideEvent only cover later changes
+        self.camera_thread.set_display_enabled(self.isVisible())
+        # Frames go straight from the camera thread to the render thread; only
+        # the finished, scaled image ever reaches the GUI thread
+        self.renderer = FrameRenderer(max_fps=self.display_fps, telemetry=self.telemetry,
+                                      telemetry_key=self.camera_thread.telemetry_key).start()
+        self.camera_thread.frame_ready.connect(self.renderer.submit, Qt.DirectConnection)
         self.camera_thread.people_count.connect(self.update_count)
+        self.camera_thread.smoothed_people_count.connect(self.update_smoothed_count)
         self.camera_thread.start()
 
         self.camera_running = True
@@ -462,6 +525,9 @@ class CameraPage(QWidget):
             self.camera_thread.stop()
             self.camera_thread.wait()
             self.camera_thread = None
+        if self.renderer:
+            self.renderer.stop()
+            self.renderer = None
 
         self.video_label.clear()
         self.count_label.setText("People in the room: 0")
@@ -470,17 +536,38 @@ class CameraPage(QWidget):
     # ---------------------
     # FRAME UPDATES
     # ---------------------
-    def update_frame(self, frame):
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = rgb.shape
-        qt_image = QImage(rgb.data, w, h, ch * w, QImage.Format_RGB888)
-        self.video_label.setPixmap(QPixmap.fromImage(qt_image))
+    def paint_frame(self):
+        """Show the newest frame prepared by the render thread, if there is one"""
+        if self.renderer is None or not self.isVisible():
+            return
+        self.renderer.set_target_size(self.video_label.width(), self.video_label.height())
+        rendered = self.renderer.take_image()
+        if rendered is None:
+            return
+        
+        start = time.perf_counter()
+        image, captured_at = rendered
+        self.video_label.setPixmap(QPixmap.fromImage(image))
+        
+        key = self.renderer.telemetry_key
+        self.telemetry.record(key, 'paint', time.perf_counter() - start)
+        if captured_at is not None:
+            self.telemetry.record(key, 'latency', time.time() - captured_at)
+
+    def update_telemetry(self):
+        """Show the current camera's per-stage latency percentiles"""
+        if self.camera_thread is not None and self.isVisible():
+            self.telemetry_card.value_label.setText(
+                self.telemetry.format_summary(self.camera_thread.telemetry_key))
 
     def update_count(self, count):
         if hasattr(self, 'count_card'):
             self.count_card.value_label.setText(str(count))
         self.current_count = count
 
+    def update_smoothed_count(self, count):
+        self.smoothed_count = count
+
     def switch_camera(self):
         """Switch to the next available camera"""
         if self.camera_thread and self.camera_running:
@@ -497,20 +584,39 @@ class CameraPage(QWidget):
         if self.camera_running:
             current_time = datetime.now()
             timestamp = current_time.strftime("%Y-%m-%d %H:%M:%S")
+            # The tracker's smoothed count doesn't flicker with single-frame misses
+            count = self.smoothed_count if self.smoothed_count is not None else self.current_count
 
             print(f"📸 Snapshot taken:")
             print(f"   Current Room Id: {self.room_id}")
-            print(f"   People in room: {self.current_count}")
+            print(f"   People in room: {count}")
             print(f"   Timestamp: {timestamp}")
 
-            # TODO: Save to database
-            self.db.save_snapshot(self.room_id, timestamp, self.current_count)
+            if self.snapshot_writer is not None:
+                # Written in the background, batched with other snapshots
+                self.snapshot_writer.submit(self.room_id, timestamp, count)
+            else:
+                self.db.save_snapshot(self.room_id, timestamp, count)
 
         else:
             print("Camera is not running - cannot take snapshot")
 
+    def showEvent(self, event):
+        if self.camera_thread:
+            self.camera_thread.set_display_enabled(True)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        # Keep counting but stop drawing frames nobody can see
+        if self.camera_thread:
+            self.camera_thread.set_display_enabled(False)
+        super().hideEvent(event)
+
     def closeEvent(self, event):
         self.stop_camera()
+        if self.inference_pool is not None:
+            self.inference_pool.stop()
+            self.inference_pool = None
         event.accept()
 
     def set_location(self, building_id, room_id):
@@ -520,6 +626,10 @@ class CameraPage(QWidget):
             f"CameraPage location set to Building ID: {building_id}, Room ID: {room_id}")
         room = self.db.get_room(room_id)
         building = self.db.get_building(building_id)
+        
+        # Per-room inference size and region of interest
+        if self.camera_thread:
+            self.camera_thread.set_room(room_id)
         print("Building from DB:", building)
         print("Room from DB:", room)
 
@@ -1,71 +1,319 @@
 from PyQt5.QtCore import QThread, pyqtSignal
-import cv2
-import numpy as np
 import sys
 import os
+import queue
+import threading
+import time
 
 # Add the project root to the path to import vision modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from vision.yolo_people_counter import PeopleCounter
-from vision.iphone import get_available_cameras, switch_camera
+from vision.yolo_people_counter import PeopleCounter, draw_person_boxes
+from vision.inference_cadence import InferenceCadence
+from vision.frame_pool import FrameHandle, FramePool
+from vision.iphone import get_cached_cameras, refresh_camera_inventory_async
+from vision.video_source import VideoSource, parse_source
+from vision.telemetry import get_telemetry
+from vision.room_config import RoomRegion, get_room_settings, tile_grid
 
 
 class CameraThread(QThread):
-    frame_ready = pyqtSignal(np.ndarray)
+    # Emits a FrameHandle; the receiver must release() it once painted
+    frame_ready = pyqtSignal(object)
     people_count = pyqtSignal(int)
+    smoothed_people_count = pyqtSignal(int)
     fps_updated = pyqtSignal(float)
 
-    def __init__(self, camera_index=0):
+    def __init__(self, camera_index=0, engine=None, source_id=None, cadence=None, motion_gate=None,
+                 tracker=None, people_counter=None):
+        """
+        Args:
+            camera_index: Camera index, RTSP/HTTP stream URL or video file path
+            engine: Optional shared InferenceEngine or ProcessInferencePool; when
+                    given, frames are handed to it instead of running a private
+                    PeopleCounter
+            source_id: Identifier to register with the engine (defaults to camera_index)
+            cadence: Optional InferenceCadence controlling which frames are inferred
+                     (defaults to every frame)
+            motion_gate: Optional MotionGate; frames of an unchanged scene skip
+                         inference and keep the last count
+            tracker: Optional PersonTracker; keeps IDs across frames, moves boxes
+                     between detection passes and provides a smoothed count
+            people_counter: Optional PeopleCounter to use instead of loading the
+                            configured model in run() (ignored with an engine)
+        """
         super().__init__()
         self.camera_index = camera_index
         self.running = True
-        self.people_counter = PeopleCounter()
-        self.available_cameras = get_available_cameras()
+        self.display_enabled = True
+        self.engine = engine
+        self.cadence = cadence if cadence is not None else InferenceCadence()
+        self.motion_gate = motion_gate
+        self.tracker = tracker
+        self.last_detections = None
+        self.current_count = 0
+        self.source_id = source_id if source_id is not None else camera_index
+        self.room_settings = get_room_settings(None)
+        self.region = None
+        self.tiling = None  # (rows, cols, overlap) sent with frames to a shared engine
+        # set_room() is called from the GUI thread; run() applies the room between frames
+        self.pending_room = None
+        self.room_requested = False
+        # Unless one is passed in, the private counter is created in run() so loading
+        # the model never blocks the GUI thread
+        self.people_counter = people_counter
+        # Engine results arrive on the engine thread; run() picks them up so the
+        # tracker, cadence and detections are only ever touched by this thread
+        self.engine_results = queue.SimpleQueue()
+        if engine is not None:
+            engine.register_source(self.source_id, self.on_detections)
+        # Only local cameras switch over to another device; a stream or file
+        # that fails stops instead of jumping to a webcam
+        self.available_cameras = []
+        kind, value = parse_source(camera_index)
+        if kind == 'device':
+            self.camera_index = value
+            # Start from the cache as is (empty on a first run); the background
+            # refresh probes new devices and fills in the list
+            self.available_cameras = get_cached_cameras()
+            refresh_camera_inventory_async(self.on_cameras_refreshed, in_use=[value])
         self.switch_requested = False
-        self.cap = None
+        self.source = None
+        self.standby = None        # VideoSource being opened for a camera switch
+        self.standby_index = None
+        self.switch_attempts = 0
+        # Per-stage timings of this camera, keyed by source_id
+        self.telemetry = get_telemetry()
+        self.telemetry_key = str(self.source_id)
+        # Decode into reusable buffers; a process pool provides shared-memory ones
+        self.frame_pool = getattr(engine, 'frame_pool', None) or FramePool(num_buffers=6)
 
     def run(self):
+        if self.engine is None and self.people_counter is None:
+            self.people_counter = PeopleCounter()
+        self.apply_room()
+        
         while self.running:
+            self.drain_engine_results()
+            
+            # Apply a room change requested from the GUI thread
+            if self.room_requested:
+                self.apply_room()
+            
             # Check if camera switch was requested
             if self.switch_requested:
-                self.switch_to_next_camera()
                 self.switch_requested = False
+                self.switch_to_next_camera()
             
-            # Initialize or reinitialize camera
-            if self.cap is None or not self.cap.isOpened():
-                self.cap = cv2.VideoCapture(self.camera_index)
-                
-                if not self.cap.isOpened():
-                    print(f"Error: Could not open camera {self.camera_index}.")
-                    # Try next camera if available
-                    if self.switch_to_next_camera():
-                        continue
-                    else:
-                        break
-
-            ret, frame = self.cap.read()
-            if not ret:
-                print(f"Error reading from camera {self.camera_index}")
-                # Try to switch to next camera
-                if self.switch_to_next_camera():
-                    continue
-                else:
+            # The next camera opens in the background; swap once it delivers frames
+            if self.standby is not None and not self.poll_standby():
+                break
+            
+            # Initialize or reinitialize the source
+            if self.source is None:
+                width, height = self.room_settings['capture_size']
+                # Opened on the first read; decoding runs in its own thread and
+                # we always consume the newest frame
+                self.source = VideoSource(self.camera_index, width, height, frame_pool=self.frame_pool)
+
+            if self.source.failed:
+                # Camera could not be opened or stopped delivering: wait for the next one
+                if self.standby is None and not self.switch_to_next_camera():
                     break
+                self.msleep(20)
+                continue
+            
+            ret, handle = self.source.read()
+            if not ret:
+                # No new frame yet: camera is slower than us or a stream is reconnecting
+                continue
+            self.telemetry.record(self.telemetry_key, 'capture', handle.capture_time)
             
-            # Use the PeopleCounter to detect and count people
-            annotated_frame = self.people_counter.detect_and_count(
-                frame, 
-                current_camera=self.camera_index, 
-                available_cameras=self.available_cameras
-            )
+            frame = handle.array
+            infer = self.cadence.should_infer() and self.scene_changed(frame)
+            submitted = False
+            if infer and self.engine is None:
+                # Use the PeopleCounter to detect and count people
+                self.commit_scene()
+                self.record_detections(self.people_counter.detect(frame))
+                self.telemetry.record_many(self.telemetry_key, self.people_counter.last_timings)
+            elif infer:
+                # Shared engine: it gets its own reference to the frame and returns
+                # the boxes through on_detections. The frame itself is shown right
+                # away with the last boxes, so frames reach the display in capture order.
+                submitted = self.engine.submit_frame(self.source_id, handle.retain(), self.region,
+                                                     self.room_settings['imgsz'], self.tiling)
+                if submitted:
+                    self.commit_scene()
+                else:
+                    # Refused (engine busy): the gate keeps comparing against the
+                    # last frame that was actually inferred
+                    handle.release()
+            if not (infer and self.engine is None) and self.tracker is not None:
+                # No detection pass on this frame: let the tracker carry the boxes forward
+                self.last_detections = self.tracker.predict()
+                self.current_count = self.last_detections['count']
             
-            # Emit the annotated frame and people count
-            self.frame_ready.emit(annotated_frame)
-            self.people_count.emit(self.people_counter.current_count)
-            self.fps_updated.emit(self.people_counter.fps)
+            # Frames that skipped inference (or are still being inferred) reuse the last boxes
+            self.emit_frame(handle, self.last_detections, shared=submitted)
             
-        if self.cap and self.cap.isOpened():
-            self.cap.release()
+        self.discard_engine_results()
+        self.release_capture()
+
+    def set_room(self, room_id):
+        """
+        Request the per-room inference size, capture size, ROI polygons and tile grid.
+        
+        Safe to call from any thread: run() applies the room between frames,
+        so the counter, motion gate and tracker are never changed mid-frame.
+        """
+        self.pending_room = room_id
+        self.room_requested = True
+
+    def apply_room(self):
+        """Apply the last room passed to set_room() (runs on the camera thread)"""
+        self.room_requested = False
+        settings = get_room_settings(self.pending_room)
+        if self.source is not None and settings['capture_size'] != self.room_settings['capture_size']:
+            # The capture size is requested when a source opens: reopen it
+            self.source.close()
+            self.source = None
+        self.room_settings = settings
+        self.region = RoomRegion.from_settings(settings)
+        self.tiling = tile_grid(settings)
+        if self.people_counter is not None:
+            self.people_counter.set_room(settings)
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        if self.tracker is not None:
+            self.tracker.reset()
+
+    def scene_changed(self, frame):
+        """Ask the motion gate (if any) whether the frame is worth inferring"""
+        if self.motion_gate is None:
+            return True
+        return self.motion_gate.has_motion(frame, update_reference=False)
+
+    def commit_scene(self):
+        """Tell the motion gate the frame it just passed is being inferred"""
+        if self.motion_gate is not None:
+            self.motion_gate.commit()
+
+    def release_capture(self):
+        """Stop the decoder threads and release the current and standby sources"""
+        if self.standby is not None:
+            self.standby.close()
+            self.standby = None
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+
+    def get_inference_stats(self):
+        """Get counters on how many frames were inferred or skipped and why"""
+        stats = {'cadence': self.cadence.get_stats()}
+        if self.source is not None:
+            stats['capture'] = self.source.get_stats()
+        if self.motion_gate is not None:
+            stats['motion'] = self.motion_gate.get_stats()
+        return stats
+
+    def record_detections(self, detections):
+        """Store the result of an inference pass and feed it back to the cadence"""
+        self.cadence.record_inference(detections['count'])
+        if self.tracker is not None:
+            detections = self.tracker.update(detections)
+        self.last_detections = detections
+        self.current_count = detections['count']
+
+    def on_detections(self, frame, detections):
+        """Receive batched results (and the frame handle) from the shared engine for run() to record"""
+        if not self.running:
+            frame.release()
+            return
+        # Batch timings (amortized per frame) when the engine runs an in-process counter
+        counter = getattr(self.engine, 'people_counter', None)
+        timings = dict(counter.last_timings) if counter is not None else None
+        self.engine_results.put((frame, detections, timings))
+        if not self.running:
+            # run() may have finished between the check above and the put
+            self.discard_engine_results()
+
+    def drain_engine_results(self):
+        """Record the results the engine queued for this camera (their frames were shown already)"""
+        while True:
+            try:
+                frame, detections, timings = self.engine_results.get_nowait()
+            except queue.Empty:
+                return
+            frame.release()
+            self.record_detections(detections)
+            self.telemetry.record_many(self.telemetry_key, timings)
+
+    def discard_engine_results(self):
+        """Release frames of engine results that will never be emitted"""
+        while True:
+            try:
+                frame, _, _ = self.engine_results.get_nowait()
+            except queue.Empty:
+                return
+            frame.release()
+
+    def emit_frame(self, handle, detections, shared=False):
+        """
+        Hand a frame to the display and publish the current count.
+        
+        Takes ownership of the handle: it is either passed on through
+        frame_ready or released right away when nobody is watching.
+        A shared frame is still being read by the engine, so boxes are
+        drawn on a copy.
+        """
+        # Only draw and emit frames when someone is watching
+        if self.display_enabled and shared:
+            handle = self.copy_frame(handle)
+        if self.display_enabled:
+            start = time.perf_counter()
+            self.annotate(handle.array, detections)
+            annotated = time.perf_counter()
+            self.frame_ready.emit(handle)
+            self.telemetry.record(self.telemetry_key, 'annotation', annotated - start)
+            self.telemetry.record(self.telemetry_key, 'emit', time.perf_counter() - annotated)
+        else:
+            handle.release()
+        self.people_count.emit(self.current_count)
+        if self.tracker is not None:
+            self.smoothed_people_count.emit(self.tracker.smoothed_count)
+        self.fps_updated.emit(self.current_fps())
+
+    def copy_frame(self, handle):
+        """Copy a frame into a buffer of its own, releasing the original"""
+        copy = self.frame_pool.acquire(handle.array.shape, handle.array.dtype)
+        if copy is None:
+            copy = FrameHandle(handle.array.copy())
+        else:
+            copy.array[...] = handle.array
+        copy.captured_at = handle.captured_at
+        copy.capture_time = handle.capture_time
+        handle.release()
+        return copy
+
+    def annotate(self, frame, detections):
+        """Draw detections on the frame for display (no-op before the first inference)"""
+        if detections is None:
+            return frame
+        return draw_person_boxes(frame, detections)
+
+    def current_fps(self):
+        """Inference FPS of whichever counter is doing the work"""
+        if self.engine is not None:
+            return self.engine.fps
+        return self.people_counter.fps if self.people_counter is not None else 0.0
+
+    def set_display_enabled(self, enabled):
+        """Turn frame annotation and frame_ready emission on or off (counting continues)"""
+        self.display_enabled = enabled
+
+    def on_cameras_refreshed(self, cameras):
+        """Adopt the camera list from a background inventory refresh"""
+        self.available_cameras = cameras
 
     def switch_camera(self):
         """Request to switch to the next available camera"""
@@ -75,28 +323,90 @@ class CameraThread(QThread):
         self.switch_requested = True
         return True
     
-    def switch_to_next_camera(self):
-        """Internal method to switch to next camera"""
-        if len(self.available_cameras) <= 1:
-            return False
-        
-        # Release current camera
-        if self.cap and self.cap.isOpened():
-            self.cap.release()
-        
-        # Get next camera index
+    def next_camera_index(self, current_index):
+        """Camera after current_index in the available list"""
         try:
-            current_position = self.available_cameras.index(self.camera_index)
+            current_position = self.available_cameras.index(current_index)
             next_position = (current_position + 1) % len(self.available_cameras)
-            self.camera_index = self.available_cameras[next_position]
+            return self.available_cameras[next_position]
         except ValueError:
             # Current camera not in list, use first available
-            self.camera_index = self.available_cameras[0]
+            return self.available_cameras[0]
+
+    def switch_to_next_camera(self):
+        """
+        Start opening the next camera in the background.
         
-        print(f"Switching to camera {self.camera_index}")
+        Counting continues on the current camera until the new one delivers
+        its first frame; poll_standby() then swaps them.
+        """
+        if len(self.available_cameras) <= 1 or self.standby is not None:
+            return False
+        
+        self.standby_index = self.next_camera_index(self.camera_index)
+        width, height = self.room_settings['capture_size']
+        standby = VideoSource(self.standby_index, width, height, frame_pool=self.frame_pool)
+        self.standby = standby
+        
+        def _open():
+            if not standby.open():
+                standby.failed = True
+            elif self.standby is not standby:
+                # Thread stopped or switch abandoned while the camera was opening
+                standby.close()
+        
+        threading.Thread(target=_open, daemon=True).start()
+        print(f"Opening camera {self.standby_index}")
         return True
 
+    def poll_standby(self):
+        """
+        Swap in the standby camera once it produces frames.
+        
+        Returns:
+            bool: False if every camera failed and the thread should stop
+        """
+        standby = self.standby
+        if standby.grabber is not None and standby.grabber.frames_grabbed > 0:
+            self.swap_source(standby, self.standby_index)
+            return True
+        if not standby.failed:
+            return True
+        
+        # Standby failed to open: keep the current camera, or try the next one if it's gone too
+        self.standby = None
+        standby.close()
+        self.switch_attempts += 1
+        if self.source is not None and not self.source.failed:
+            self.switch_attempts = 0
+            return True
+        if self.switch_attempts >= len(self.available_cameras):
+            return False
+        self.camera_index = self.standby_index
+        return self.switch_to_next_camera()
+
+    def swap_source(self, source, camera_index):
+        """Make an already running source the current one"""
+        previous = self.source
+        self.source = source
+        self.camera_index = camera_index
+        self.standby = None
+        self.switch_attempts = 0
+        if previous is not None:
+            # Joining the decoder and releasing the device can take a while
+            threading.Thread(target=previous.close, daemon=True).start()
+        
+        # Boxes from the previous camera are meaningless on the new one
+        self.last_detections = None
+        self.cadence.reset()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        if self.tracker is not None:
+            self.tracker.reset()
+        
+        print(f"Switched to camera {self.camera_index}")
+
     def stop(self):
         self.running = False
-        if self.cap and self.cap.isOpened():
-            self.cap.release()
+        if self.engine is not None:
+            self.engine.unregister_source(self.source_id)
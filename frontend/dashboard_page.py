@@ -10,13 +10,15 @@ import numpy as np
 
 
 class DashboardPage(QWidget):
-    def __init__(self, db, switch_to_camera, switch_to_automation):
+    def __init__(self, db, switch_to_camera, switch_to_automation, switch_to_video_wall=None):
         super().__init__()
         self.db = db
         self.switch_to_camera = switch_to_camera
         self.switch_to_automation = switch_to_automation
+        self.switch_to_video_wall = switch_to_video_wall
         self.selected_building_id = None
         self.selected_room_id = None
+        self.plot_days = 30  # most recent days shown in the attendance charts
 
         # Set up the futuristic dashboard layout
         self.setup_dashboard_ui()
@@ -346,6 +348,27 @@ class DashboardPage(QWidget):
         """)
         automation_btn.clicked.connect(self.go_to_automation)
         
+        video_wall_btn = QPushButton("Video Wall")
+        video_wall_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #9c27b0, stop:1 #7b1fa2);
+                border: none;
+                border-radius: 10px;
+                color: #ffffff;
+                font-size: 16px;
+                font-weight: bold;
+                padding: 15px;
+                margin-top: 10px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #ba68c8, stop:1 #9c27b0);
+            }
+        """)
+        video_wall_btn.clicked.connect(self.go_to_video_wall)
+        video_wall_btn.setVisible(self.switch_to_video_wall is not None)
+        
         # Add all widgets
         controls_layout.addWidget(title)
         controls_layout.addWidget(building_label)
@@ -354,6 +377,7 @@ class DashboardPage(QWidget):
         controls_layout.addWidget(self.roomComboBox)
         controls_layout.addWidget(camera_btn)
         controls_layout.addWidget(automation_btn)
+        controls_layout.addWidget(video_wall_btn)
         controls_layout.addStretch()
         
         controls_frame.setLayout(controls_layout)
@@ -411,6 +435,9 @@ class DashboardPage(QWidget):
     def go_to_automation(self):
         self.switch_to_automation()
 
+    def go_to_video_wall(self):
+        self.switch_to_video_wall()
+
     def on_building_changed(self, index):
         if index >= 0 and index < len(self.building_ids):
             self.selected_building_id = self.building_ids[index]
@@ -435,25 +462,26 @@ class DashboardPage(QWidget):
             self.selected_room_id = self.room_ids[0]
 
     def update_plot_for_building(self, building_id):
-        # Fetch attendance or other data for the building
-        # Example: Replace with your actual query
+        # Daily rollups, so the query stays small however long the history is
         import pandas as pd
-        # Dummy data for demonstration
-        data = pd.DataFrame({
-            "date": ["2023-10-01", "2023-10-02", "2023-10-03"],
-            "attendance": [20, 25, 22]
-        })
+        rows = self.db.get_building_occupancy(building_id, granularity='day')
+        data = None
+        if rows:
+            data = pd.DataFrame(rows).groupby("bucket_start", as_index=False)["avg_count"].sum()
+            data = data.tail(self.plot_days).rename(columns={"bucket_start": "date", "avg_count": "attendance"})
+            data["date"] = data["date"].str[:10]
         self.plot_sample_graph(
             data, title=f"Attendance for Building {building_id}")
 
     def update_plot_for_room(self, room_id):
-        # Fetch attendance or other data for the room
         import pandas as pd
-        # Dummy data for demonstration
-        data = pd.DataFrame({
-            "date": ["2023-10-01", "2023-10-02", "2023-10-03"],
-            "attendance": [12, 15, 14]
-        })
+        rows = self.db.get_occupancy(room_id, granularity='day')[-self.plot_days:]
+        data = None
+        if rows:
+            data = pd.DataFrame({
+                "date": [row["bucket_start"][:10] for row in rows],
+                "attendance": [row["avg_count"] for row in rows]
+            })
         self.plot_sample_graph(data, title=f"Attendance for Room {room_id}")
 
     def load_buildings(self):
@@ -0,0 +1,155 @@
+import threading
+import time
+import cv2
+import numpy as np
+from PyQt5.QtGui import QImage
+from vision.frame_pool import as_array, release_frame
+
+
+class FrameRenderer:
+    """
+    Prepares camera frames for display off the GUI thread.
+
+    Frames are submitted from the camera thread into a pending slot per key
+    (one key per view; a single view uses the default key None). A frame
+    that is replaced before it was rendered is dropped, so a burst of frames
+    costs one render. The render thread converts BGR to RGB and scales to
+    the view's display size at most max_fps times per second and leaves the
+    result as a QImage. The GUI only has to pick up the newest image on a
+    timer and turn it into a pixmap. Several views (e.g. the tiles of the
+    video wall) can share one renderer and its thread.
+    """
+
+    def __init__(self, max_fps=15, name="renderer", telemetry=None, telemetry_key=None):
+        """
+        Args:
+            max_fps: Upper bound on rendered frames per second
+            name: Label used for the render thread
+            telemetry: Optional PipelineTelemetry to record render time into
+            telemetry_key: Camera key for the telemetry samples of the default key
+                           (other keys are recorded under their own name)
+        """
+        self.frame_interval = 1.0 / max_fps if max_fps else 0.0
+        self.name = name
+        self.telemetry = telemetry
+        self.telemetry_key = telemetry_key
+        self._target_sizes = {}  # key -> (width, height); missing = keep frame size
+
+        self._condition = threading.Condition()
+        self._pending = {}       # key -> newest FrameHandle waiting to be rendered
+        self._images = {}        # key -> (QImage, captured_at) waiting to be painted
+        self._rgb_buffer = None
+        self.running = False
+        self.render_thread = None
+
+        self.frames_submitted = 0
+        self.frames_coalesced = 0
+        self.frames_rendered = 0
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.render_thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self.render_thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self.render_thread is not None:
+            self.render_thread.join(timeout=1.0)
+            self.render_thread = None
+        with self._condition:
+            for frame in self._pending.values():
+                release_frame(frame)
+            self._pending = {}
+            self._images = {}
+
+    def set_target_size(self, width, height, key=None):
+        """Scale rendered images of a view to this size (the display label's size)."""
+        self._target_sizes[key] = (max(1, int(width)), max(1, int(height)))
+
+    def submit(self, frame, key=None):
+        """
+        Queue a frame of a view for rendering, replacing its frame not rendered yet.
+
+        Safe to call from any thread; takes ownership of the frame.
+        """
+        with self._condition:
+            replaced = self._pending.get(key)
+            if replaced is not None:
+                release_frame(replaced)
+                self.frames_coalesced += 1
+            self._pending[key] = frame
+            self.frames_submitted += 1
+            self._condition.notify_all()
+
+    def take_image(self, key=None):
+        """
+        Newest rendered image of a view not painted yet.
+
+        Returns:
+            tuple: (QImage, captured_at) or None
+        """
+        with self._condition:
+            return self._images.pop(key, None)
+
+    def remove(self, key):
+        """Forget a view, releasing its pending frame."""
+        with self._condition:
+            frame = self._pending.pop(key, None)
+            self._images.pop(key, None)
+            self._target_sizes.pop(key, None)
+        if frame is not None:
+            release_frame(frame)
+
+    def _render(self, frame, target_size):
+        bgr = as_array(frame)
+        if target_size is not None and (bgr.shape[1], bgr.shape[0]) != target_size:
+            # Downscale from BGR first so the color conversion touches fewer pixels
+            bgr = cv2.resize(bgr, target_size, interpolation=cv2.INTER_AREA)
+        if self._rgb_buffer is None or self._rgb_buffer.shape != bgr.shape:
+            self._rgb_buffer = np.empty_like(bgr)
+        cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+        h, w, ch = self._rgb_buffer.shape
+        # copy() detaches the image from the reused buffer
+        return QImage(self._rgb_buffer.data, w, h, ch * w, QImage.Format_RGB888).copy()
+
+    def _run(self):
+        next_render_time = time.time()
+        while self.running:
+            delay = next_render_time - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or not self.running, timeout=0.5)
+                pending = self._pending
+                self._pending = {}
+            if not pending:
+                continue
+
+            for key, frame in pending.items():
+                start = time.perf_counter()
+                captured_at = getattr(frame, 'captured_at', None)
+                try:
+                    image = self._render(frame, self._target_sizes.get(key))
+                finally:
+                    release_frame(frame)
+                if self.telemetry is not None:
+                    telemetry_key = self.telemetry_key if key is None else key
+                    self.telemetry.record(telemetry_key, 'render', time.perf_counter() - start)
+
+                with self._condition:
+                    self._images[key] = (image, captured_at)
+                    self.frames_rendered += 1
+            next_render_time = max(next_render_time + self.frame_interval, time.time())
+
+    def get_stats(self):
+        with self._condition:
+            return {
+                'frames_submitted': self.frames_submitted,
+                'frames_coalesced': self.frames_coalesced,
+                'frames_rendered': self.frames_rendered,
+            }
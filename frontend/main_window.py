@@ -10,7 +10,12 @@ from frontend.camera_page import CameraPage
 from frontend.dashboard_page import DashboardPage
 from frontend.login_page import LoginPage
 from frontend.automation_page import AutomationPage
+from frontend.video_wall_page import VideoWallPage
 from database.db_repository import Database
+from database.snapshot_writer import SnapshotWriter
+from vision.yolo_people_counter import preload_people_counter
+from vision.backends import load_vision_config
+from vision.telemetry import start_telemetry_exports
 
 
 
@@ -21,6 +26,16 @@ class MainWindow(QMainWindow):
         self.resize(1400, 900)
         self.setMinimumSize(1200, 800)
         self.db = Database()
+        # Snapshots are written in batches from a background thread
+        self.snapshot_writer = SnapshotWriter(self.db.db_path).start()
+        
+        # Load and warm the detection model while the user logs in
+        preload_people_counter()
+        
+        vision_config = load_vision_config()
+        
+        # Per-stage timing collection, plus file/HTTP export if configured
+        start_telemetry_exports(vision_config.get('telemetry'))
         
         # Apply futuristic theme
         self.apply_futuristic_theme()
@@ -40,18 +55,27 @@ class MainWindow(QMainWindow):
         # Pages
         self.login_page = LoginPage(self.show_dashboard)
         self.dashboard_page = DashboardPage(
-            self.db, self.show_camera, self.show_automation)
-        self.camera_page = CameraPage(self.db, self.show_dashboard)
+            self.db, self.show_camera, self.show_automation, self.show_video_wall)
+        self.camera_page = CameraPage(self.db, self.show_dashboard,
+                                      inference_workers=vision_config['inference_workers'],
+                                      snapshot_writer=self.snapshot_writer)
         self.automation_page = AutomationPage(
             self.show_dashboard, self.get_snapshot_data)
+        self.video_wall_page = VideoWallPage(self.db, self.show_dashboard)
 
         self.stacked_widget.addWidget(self.login_page)
         self.stacked_widget.addWidget(self.dashboard_page)
         self.stacked_widget.addWidget(self.camera_page)
         self.stacked_widget.addWidget(self.automation_page)
+        self.stacked_widget.addWidget(self.video_wall_page)
 
         self.show_login()
 
+    def closeEvent(self, event):
+        # Write out snapshots still waiting in the queue
+        self.snapshot_writer.close()
+        super().closeEvent(event)
+
     def show_login(self):
         self.stacked_widget.setCurrentWidget(self.login_page)
 
@@ -67,6 +91,10 @@ class MainWindow(QMainWindow):
     def show_automation(self):
         self.stacked_widget.setCurrentWidget(self.automation_page)
 
+    def show_video_wall(self):
+        self.video_wall_page.set_building(self.dashboard_page.selected_building_id)
+        self.stacked_widget.setCurrentWidget(self.video_wall_page)
+
     def get_snapshot_data(self):
         """Get current snapshot data from camera page."""
         # This will be called by the automation scheduler
@@ -0,0 +1,337 @@
+import math
+import threading
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QFrame, QGridLayout
+import PyQt5.QtCore as QtCore
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import Qt
+from frontend.camera_thread import CameraThread
+from frontend.frame_renderer import FrameRenderer
+from vision.inference_cadence import InferenceCadence
+from vision.inference_engine import InferenceEngine
+from vision.motion_gate import MotionGate
+from vision.tracker import PersonTracker
+from vision.room_config import get_room_settings
+from vision.telemetry import get_telemetry
+
+
+class VideoWallTile(QFrame):
+    """One room on the video wall: low-res preview plus live count."""
+
+    stopped = QtCore.pyqtSignal()
+
+    def __init__(self, room, parent=None):
+        super().__init__(parent)
+        self.room = room
+        self.camera_thread = None
+        self.renderer = None
+        self.render_key = f"room:{room['room_id']}"
+        self._restart = None  # (engine, renderer) to start with once the old thread is gone
+        self.setStyleSheet("""
+            QFrame {
+                background: rgba(0, 0, 0, 0.6);
+                border: 2px solid #00d4ff40;
+                border-radius: 12px;
+            }
+            QFrame * {
+                border: none;
+            }
+        """)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(4)
+
+        self.video_label = QLabel("No camera configured")
+        self.video_label.setAlignment(Qt.AlignCenter)
+        self.video_label.setMinimumSize(160, 120)
+        self.video_label.setScaledContents(True)
+        self.video_label.setStyleSheet("QLabel { color: #9e9e9e; font-size: 13px; }")
+
+        self.title_label = QLabel(f"Room {room['number']}")
+        self.title_label.setStyleSheet("""
+            QLabel {
+                font-size: 15px;
+                font-weight: bold;
+                color: #00d4ff;
+                background: transparent;
+            }
+        """)
+
+        layout.addWidget(self.video_label, stretch=1)
+        layout.addWidget(self.title_label)
+        self.setLayout(layout)
+
+    @property
+    def running(self):
+        """True while the capture thread exists (including while it shuts down)."""
+        return self.camera_thread is not None
+
+    def start(self, engine, renderer):
+        """Start this room's capture thread on the shared engine and renderer."""
+        source = get_room_settings(self.room['room_id']).get('camera')
+        if source is None:
+            return
+        if self.camera_thread is not None:
+            # Still shutting down from the last stop; start once it has finished
+            self._restart = (engine, renderer)
+            return
+        self.video_label.setText("Connecting...")
+        # Occupancy barely changes between seconds; keep inference cheap per room
+        self.camera_thread = CameraThread(source, engine=engine, source_id=self.render_key,
+                                          cadence=InferenceCadence(target_fps=2, adaptive=True),
+                                          motion_gate=MotionGate(), tracker=PersonTracker())
+        self.camera_thread.set_room(self.room['room_id'])
+        self.renderer = renderer
+        self.camera_thread.frame_ready.connect(lambda frame, key=self.render_key: renderer.submit(frame, key),
+                                               Qt.DirectConnection)
+        self.camera_thread.finished.connect(self.on_thread_finished)
+        self.camera_thread.start()
+
+    def request_stop(self):
+        """Ask the capture thread to stop; stopped is emitted once it has."""
+        self._restart = None
+        if self.camera_thread is not None:
+            self.camera_thread.stop()
+
+    def on_thread_finished(self):
+        """The capture thread has exited: drop it and this room's render slot."""
+        self.camera_thread = None
+        if self.renderer is not None:
+            self.renderer.remove(self.render_key)
+            self.renderer = None
+        self.stopped.emit()
+        if self._restart is not None:
+            engine, renderer = self._restart
+            self._restart = None
+            self.start(engine, renderer)
+
+    def refresh(self):
+        """Paint the newest rendered preview and the current count."""
+        if self.renderer is None or self.camera_thread is None:
+            return
+        self.renderer.set_target_size(self.video_label.width(), self.video_label.height(), self.render_key)
+        rendered = self.renderer.take_image(self.render_key)
+        if rendered is not None:
+            self.video_label.setPixmap(QPixmap.fromImage(rendered[0]))
+        tracker = self.camera_thread.tracker
+        count = tracker.smoothed_count if tracker is not None else self.camera_thread.current_count
+        self.title_label.setText(f"Room {self.room['number']}  —  {count} people")
+
+
+class VideoWallPage(QWidget):
+    """
+    Grid of rooms with live previews and counts.
+
+    Every tile feeds the same InferenceEngine, so one model instance serves
+    the whole wall in batched forward passes, and one FrameRenderer thread
+    prepares every preview at a low rate. Each room still needs its own
+    capture thread, since every room has its own camera. One timer paints
+    every tile, so the GUI work does not grow with the camera frame rates.
+    Loading the model, stopping the engine and shutting tiles down all happen
+    off the GUI thread.
+    """
+
+    engine_ready = QtCore.pyqtSignal(object)
+
+    def __init__(self, db, back_to_dashboard, max_tiles=16, display_fps=5):
+        """
+        Args:
+            db: Database repository
+            back_to_dashboard: Callback to navigate back
+            max_tiles: Maximum number of rooms shown at once
+            display_fps: Preview refresh rate per tile
+        """
+        super().__init__()
+        self.db = db
+        self.back_to_dashboard = back_to_dashboard
+        self.max_tiles = max_tiles
+        self.display_fps = display_fps
+        self.building_id = None
+        self.engine = None
+        self.renderer = FrameRenderer(max_fps=display_fps, name="video-wall-renderer", telemetry=get_telemetry())
+        self.tiles = []
+        self.retired_tiles = []  # removed tiles whose capture thread is still shutting down
+        self.running = False
+        self._engine_loading = False
+        self._engine_stopper = None
+
+        self.setup_wall_ui()
+
+        self.paint_timer = QtCore.QTimer(self)
+        self.paint_timer.timeout.connect(self.refresh_tiles)
+        self.engine_ready.connect(self.on_engine_ready)
+
+    def setup_wall_ui(self):
+        """Setup the video wall interface."""
+        main_layout = QVBoxLayout()
+        main_layout.setContentsMargins(30, 30, 30, 30)
+        main_layout.setSpacing(20)
+
+        header_layout = QHBoxLayout()
+        self.title_label = QLabel("🧱 Video Wall")
+        self.title_label.setStyleSheet("""
+            QLabel {
+                font-size: 32px;
+                font-weight: bold;
+                color: #00d4ff;
+                background: transparent;
+            }
+        """)
+
+        back_btn = QPushButton("Back to Dashboard")
+        back_btn.setStyleSheet("""
+            QPushButton {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #757575, stop:1 #616161);
+                border: none;
+                border-radius: 10px;
+                color: #ffffff;
+                font-size: 16px;
+                font-weight: bold;
+                padding: 15px 25px;
+            }
+            QPushButton:hover {
+                background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                    stop:0 #9e9e9e, stop:1 #757575);
+            }
+        """)
+        back_btn.clicked.connect(self.back_to_dashboard)
+
+        header_layout.addWidget(self.title_label)
+        header_layout.addStretch()
+        header_layout.addWidget(back_btn)
+
+        self.grid_layout = QGridLayout()
+        self.grid_layout.setSpacing(12)
+
+        main_layout.addLayout(header_layout)
+        main_layout.addLayout(self.grid_layout, stretch=1)
+        self.setLayout(main_layout)
+
+    def set_building(self, building_id):
+        """Show the rooms of a building (up to max_tiles)."""
+        if building_id == self.building_id and self.tiles:
+            return
+        self.stop_wall()
+        for tile in self.tiles:
+            self.grid_layout.removeWidget(tile)
+            tile.hide()
+            if tile.running:
+                # Deleting the tile now would destroy a QThread that is still running
+                self.retired_tiles.append(tile)
+                tile.stopped.connect(lambda tile=tile: self.drop_retired_tile(tile))
+            else:
+                tile.deleteLater()
+        self.tiles = []
+
+        self.building_id = building_id
+        if building_id is None:
+            return
+        building = self.db.get_building(building_id)
+        rooms = self.db.get_rooms_by_building(building_id)[:self.max_tiles]
+        self.title_label.setText(f"🧱 Video Wall — {building['name']}")
+
+        columns = max(1, math.ceil(math.sqrt(len(rooms))))
+        for position, room in enumerate(rooms):
+            tile = VideoWallTile(room)
+            self.grid_layout.addWidget(tile, position // columns, position % columns)
+            self.tiles.append(tile)
+
+        if self.isVisible():
+            self.start_wall()
+
+    def drop_retired_tile(self, tile):
+        if tile in self.retired_tiles:
+            self.retired_tiles.remove(tile)
+            tile.deleteLater()
+
+    def start_wall(self):
+        """Start every tile on one shared inference engine, loading it in the background."""
+        if self.running:
+            return
+        self.running = True
+        if self._engine_loading:
+            # on_engine_ready starts the tiles
+            return
+        self._engine_loading = True
+        stopper = self._engine_stopper
+        threading.Thread(target=self._prepare_engine, args=(stopper,), daemon=True).start()
+
+    def _prepare_engine(self, stopper):
+        """Create (first time) and start the engine; runs on a helper thread."""
+        if stopper is not None:
+            # A previous stop_wall() may still be shutting the engine down
+            stopper.join()
+        try:
+            engine = self.engine if self.engine is not None else InferenceEngine()
+            engine.start()
+        except Exception as e:
+            print(f"Error loading the video wall model: {e}")
+            engine = None
+        self.engine_ready.emit(engine)
+
+    def on_engine_ready(self, engine):
+        """Start the tiles once the engine runs (GUI thread)."""
+        self._engine_loading = False
+        if engine is None:
+            self.running = False
+            return
+        self.engine = engine
+        if not self.running:
+            # The wall was hidden while the model was loading
+            self._stop_engine()
+            return
+        self.renderer.start()
+        for tile in self.tiles:
+            tile.start(self.engine, self.renderer)
+        self.paint_timer.start(int(1000 / self.display_fps))
+
+    def stop_wall(self, wait=False):
+        """
+        Stop all tiles and the engine (nothing runs while the wall is hidden).
+
+        Tiles shut down in the background unless wait is True.
+        """
+        if not self.running:
+            return
+        self.running = False
+        self.paint_timer.stop()
+        for tile in self.tiles:
+            tile.request_stop()
+        if not self._engine_loading:
+            self._stop_engine()
+        if wait:
+            for tile in self.tiles + self.retired_tiles:
+                if tile.camera_thread is not None:
+                    tile.camera_thread.wait()
+            if self._engine_stopper is not None:
+                self._engine_stopper.join()
+
+    def _stop_engine(self):
+        """Stop the engine and renderer threads on a helper thread."""
+        engine, renderer = self.engine, self.renderer
+
+        def _stop():
+            if engine is not None:
+                engine.stop()
+            renderer.stop()
+
+        self._engine_stopper = threading.Thread(target=_stop, daemon=True)
+        self._engine_stopper.start()
+
+    def refresh_tiles(self):
+        for tile in self.tiles:
+            tile.refresh()
+
+    def showEvent(self, event):
+        if self.tiles:
+            self.start_wall()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.stop_wall()
+        super().hideEvent(event)
+
+    def closeEvent(self, event):
+        self.stop_wall(wait=True)
+        event.accept()
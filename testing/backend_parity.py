@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Backend parity check - runs the PyTorch model and an exported CPU backend on
+the same frames and verifies that they produce the same person counts.
+
+Usage:
+    python testing/backend_parity.py onnx --video path/to/classroom.mp4
+    python testing/backend_parity.py openvino --images path/to/frames/
+    python testing/backend_parity.py onnx --video path/to/classroom.mp4 --batch-size 8
+
+Exits with status 1 if more than --max-mismatch-rate of the frames disagree.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+from vision.yolo_people_counter import PeopleCounter
+
+
+def load_frames(video=None, images=None, every_n=10, max_frames=200):
+    """Collect test frames from a video file or a directory of images."""
+    frames = []
+    if images:
+        paths = sorted(glob.glob(os.path.join(images, '*.jpg')) + glob.glob(os.path.join(images, '*.png')))
+        for path in paths[:max_frames]:
+            frame = cv2.imread(path)
+            if frame is not None:
+                frames.append(frame)
+    elif video:
+        cap = cv2.VideoCapture(video)
+        index = 0
+        while len(frames) < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if index % every_n == 0:
+                frames.append(frame)
+            index += 1
+        cap.release()
+    return frames
+
+
+def run_counter(counter, frames, batch_size=1):
+    """Count people on every frame, returning counts and frames/sec.
+
+    With batch_size > 1 the frames go through detect_batch() in groups, the
+    way the shared engine and the batch jobs call the model.
+    """
+    counts = []
+    start_time = time.time()
+    if batch_size > 1:
+        for start in range(0, len(frames), batch_size):
+            batch = [frame.copy() for frame in frames[start:start + batch_size]]
+            counts.extend(detections['count'] for detections in counter.detect_batch(batch))
+    else:
+        for frame in frames:
+            counts.append(counter.detect(frame.copy())['count'])
+    elapsed = time.time() - start_time
+    return counts, len(frames) / elapsed if elapsed > 0 else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare person counts between inference backends")
+    parser.add_argument('backend', choices=['onnx', 'openvino'])
+    parser.add_argument('--model', default='best.pt')
+    parser.add_argument('--video', help="Video file to sample frames from")
+    parser.add_argument('--images', help="Directory of .jpg/.png frames")
+    parser.add_argument('--every-n', type=int, default=10, help="Sample every Nth video frame")
+    parser.add_argument('--max-frames', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=4,
+                        help="Frames per forward pass for the batched check (1 = single frames only)")
+    parser.add_argument('--max-mismatch-rate', type=float, default=0.02,
+                        help="Allowed fraction of frames whose counts differ")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.images, args.every_n, args.max_frames)
+    if not frames:
+        print("No frames to compare! Pass --video or --images.")
+        return 1
+
+    print(f"Comparing torch vs {args.backend} on {len(frames)} frames...")
+    reference = PeopleCounter(args.model, backend='torch')
+    candidate = PeopleCounter(args.model, backend=args.backend)
+    reference_counts, reference_fps = run_counter(reference, frames)
+    candidate_counts, candidate_fps = run_counter(candidate, frames)
+    if args.batch_size > 1:
+        # Batched passes must agree with the single-frame reference too
+        print(f"Running {args.backend} in batches of {args.batch_size}...")
+        try:
+            batched_counts, _ = run_counter(candidate, frames, args.batch_size)
+        except Exception as e:
+            print(f"FAIL: batched inference on {args.backend} raised {e}")
+            return 1
+        batch_mismatches = sum(a != b for a, b in zip(reference_counts, batched_counts))
+        print(f"Batched mismatches: {batch_mismatches}/{len(frames)}")
+        if batch_mismatches / len(frames) > args.max_mismatch_rate:
+            print(f"FAIL: batched {args.backend} counts diverge from the PyTorch model")
+            return 1
+
+    mismatches = [(i, a, b) for i, (a, b) in enumerate(zip(reference_counts, candidate_counts)) if a != b]
+    mismatch_rate = len(mismatches) / len(frames)
+    max_abs_error = max((abs(a - b) for _, a, b in mismatches), default=0)
+
+    print(f"torch:        {reference_fps:.1f} frames/sec")
+    print(f"{args.backend + ':':<13} {candidate_fps:.1f} frames/sec")
+    print(f"Mismatched frames: {len(mismatches)}/{len(frames)} ({mismatch_rate:.1%}), max count error {max_abs_error}")
+    for i, a, b in mismatches[:10]:
+        print(f"  frame {i}: torch={a} {args.backend}={b}")
+
+    if mismatch_rate > args.max_mismatch_rate:
+        print("FAIL: backend counts diverge from the PyTorch model")
+        return 1
+    print("PASS")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
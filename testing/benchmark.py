@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Vision benchmark - runs the people counter headlessly over recorded video
+fixtures and reports throughput, latency percentiles, memory and count
+accuracy, saved as JSON so runs can be compared.
+
+Usage:
+    python testing/benchmark.py                              # every fixture in testing/fixtures/
+    python testing/benchmark.py --fixtures recordings/ --mode counter
+    python testing/benchmark.py --compare benchmark_results/previous.json
+
+Fixtures are video files; a JSON file with the same name holds the labels:
+
+    {"counts": {"0": 12, "300": 14, "600": 14}}
+
+mapping frame indices to the true number of people. Two modes:
+
+    counter    PeopleCounter.detect on sampled frames, as fast as possible
+    pipeline   the full CameraThread (decoder thread, cadence, motion gate,
+               tracker, telemetry) playing the video at its native rate
+
+Unlabeled fixtures are benchmarked without accuracy figures. Recordings are
+not committed; testing/fetch_fixtures.py builds a small labeled sample clip.
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from vision.backends import load_vision_config
+from vision.yolo_people_counter import PeopleCounter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov')
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process in MB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb():
+    """Current resident memory of this process in MB (None where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def memory_stats(rss_before):
+    """
+    Memory figures of one run.
+
+    ru_maxrss is a high-water mark for the whole process, so after the first
+    run it mostly reflects earlier fixtures and modes; the RSS before and
+    after the run shows what this run itself added.
+    """
+    rss_after = current_rss_mb()
+    growth = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+    return {'rss_before_mb': rss_before, 'rss_after_mb': rss_after, 'rss_growth_mb': growth,
+            'process_peak_mb': peak_memory_mb()}
+
+
+def latency_stats(seconds):
+    """Percentiles of a list of durations, in milliseconds."""
+    if not seconds:
+        return {}
+    samples = np.array(seconds) * 1000.0
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {'mean_ms': float(samples.mean()), 'p50_ms': float(p50), 'p95_ms': float(p95),
+            'p99_ms': float(p99), 'max_ms': float(samples.max())}
+
+
+def count_accuracy(predicted, labels):
+    """
+    Compare predicted counts against labels.
+
+    Args:
+        predicted: dict frame index -> predicted count
+        labels: dict frame index -> true count
+    """
+    pairs = [(predicted[index], truth) for index, truth in labels.items() if index in predicted]
+    if not pairs:
+        return {}
+    errors = [abs(p - t) for p, t in pairs]
+    return {
+        'labeled_frames': len(pairs),
+        'mae': sum(errors) / len(errors),
+        'max_error': max(errors),
+        'exact_match_rate': sum(1 for e in errors if e == 0) / len(errors),
+    }
+
+
+def find_fixtures(path):
+    """List (name, video path, labels) for every video under path."""
+    videos = [path] if os.path.isfile(path) else sorted(
+        p for p in glob.glob(os.path.join(path, '*')) if p.lower().endswith(VIDEO_EXTENSIONS))
+    fixtures = []
+    for video in videos:
+        labels_path = os.path.splitext(video)[0] + '.json'
+        labels = None
+        if os.path.exists(labels_path):
+            with open(labels_path, 'r') as f:
+                labels = {int(index): int(count) for index, count in json.load(f)['counts'].items()}
+        fixtures.append((os.path.splitext(os.path.basename(video))[0], video, labels))
+    return fixtures
+
+
+def bench_counter(counter, video, labels=None, every_n=5, max_frames=None, warmup=5):
+    """Run PeopleCounter.detect on every Nth frame plus every labeled frame."""
+    rss_before = current_rss_mb()
+    cap = cv2.VideoCapture(video)
+    predicted = {}
+    latencies = []
+    index = 0
+    inferred = 0
+    start = None
+    while max_frames is None or inferred < max_frames:
+        if not cap.grab():
+            break
+        if index % every_n == 0 or (labels and index in labels):
+            ret, frame = cap.retrieve()
+            if ret:
+                frame_start = time.perf_counter()
+                predicted[index] = counter.detect(frame)['count']
+                elapsed = time.perf_counter() - frame_start
+                inferred += 1
+                # The first frames include lazy initialization, keep them out of the figures
+                if inferred == warmup:
+                    start = time.perf_counter()
+                elif inferred > warmup:
+                    latencies.append(elapsed)
+        index += 1
+    cap.release()
+
+    total = time.perf_counter() - start if start is not None else 0.0
+    result = {
+        'frames_inferred': inferred,
+        'fps': len(latencies) / total if total > 0 else 0.0,
+        'latency': latency_stats(latencies),
+        'memory': memory_stats(rss_before),
+    }
+    if labels:
+        result['accuracy'] = count_accuracy(predicted, labels)
+    return result
+
+
+def bench_pipeline(video, labels=None, max_seconds=None, counter=None):
+    """
+    Run the full CameraThread pipeline over a video at its native frame rate.
+
+    Args:
+        counter: PeopleCounter to run (default: the model configured in vision/config.json)
+    """
+    from PyQt5.QtCore import QCoreApplication, QTimer
+    from frontend.camera_thread import CameraThread
+    from vision.inference_cadence import InferenceCadence
+    from vision.motion_gate import MotionGate
+    from vision.tracker import PersonTracker
+    from vision.telemetry import get_telemetry
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    rss_before = current_rss_mb()
+    cap = cv2.VideoCapture(video)
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    cap.release()
+
+    thread = CameraThread(video, source_id=f"bench:{os.path.basename(video)}",
+                          cadence=InferenceCadence(target_fps=5, adaptive=True),
+                          motion_gate=MotionGate(), tracker=PersonTracker(), people_counter=counter)
+    get_telemetry().reset(thread.telemetry_key)
+    frames = []
+    counts = []
+    start = time.time()
+
+    def on_frame(handle):
+        frames.append(time.time() - handle.captured_at)
+        handle.release()
+
+    def on_count(count):
+        counts.append((time.time() - start, count))
+
+    thread.frame_ready.connect(on_frame)
+    thread.people_count.connect(on_count)
+    # Poll instead of connecting finished, which could fire before exec_() starts
+    watchdog = QTimer()
+    watchdog.timeout.connect(lambda: thread.isFinished() and app.quit())
+    watchdog.start(200)
+    if max_seconds:
+        QTimer.singleShot(int(max_seconds * 1000), thread.stop)
+    thread.start()
+    app.exec_()
+    watchdog.stop()
+    thread.stop()
+    thread.wait()
+    elapsed = time.time() - start
+
+    stats = thread.get_inference_stats()
+    result = {
+        'seconds': elapsed,
+        'frames_displayed': len(frames),
+        'display_fps': len(frames) / elapsed if elapsed > 0 else 0.0,
+        'frame_latency': latency_stats(frames),
+        'stages': get_telemetry().summary(thread.telemetry_key).get(thread.telemetry_key, {}),
+        'cadence': stats['cadence'],
+        'memory': memory_stats(rss_before),
+    }
+    if labels and counts:
+        # Counts are matched to labels by playback time, so this is approximate
+        times = np.array([t for t, _ in counts])
+        predicted = {}
+        for index in labels:
+            position = np.searchsorted(times, index / video_fps)
+            if position < len(counts):
+                predicted[index] = counts[position][1]
+        result['accuracy'] = count_accuracy(predicted, labels)
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(current, previous):
+    """Print throughput and accuracy changes against an earlier results file."""
+    print(f"\nCompared with {previous.get('created')} ({previous.get('commit')}):")
+    for name, modes in current['fixtures'].items():
+        for mode, result in modes.items():
+            before = previous.get('fixtures', {}).get(name, {}).get(mode)
+            if not before:
+                continue
+            fps_key = 'fps' if mode == 'counter' else 'display_fps'
+            line = f"  {name} [{mode}] fps {before[fps_key]:.1f} -> {result[fps_key]:.1f}"
+            mae_before = before.get('accuracy', {}).get('mae')
+            mae_now = result.get('accuracy', {}).get('mae')
+            if mae_before is not None and mae_now is not None:
+                line += f", MAE {mae_before:.2f} -> {mae_now:.2f}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless vision benchmark over recorded fixtures")
+    parser.add_argument('--fixtures', default='testing/fixtures', help="Video file or directory of fixtures")
+    parser.add_argument('--mode', choices=['counter', 'pipeline', 'both'], default='both')
+    parser.add_argument('--model', default=None, help="Model weights (default: vision/config.json)")
+    parser.add_argument('--backend', default=None, help="Inference backend (default: vision/config.json)")
+    parser.add_argument('--every-n', type=int, default=5, help="Counter mode: infer every Nth frame")
+    parser.add_argument('--max-frames', type=int, default=None, help="Counter mode: stop after N inferences")
+    parser.add_argument('--max-seconds', type=float, default=None, help="Pipeline mode: stop after N seconds")
+    parser.add_argument('--output-dir', default='benchmark_results')
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    fixtures = find_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No video fixtures found in {args.fixtures} "
+              f"(create a labeled sample with python testing/fetch_fixtures.py)")
+        return 1
+
+    report = {
+        'created': datetime.now().isoformat(),
+        'commit': git_commit(),
+        'config': load_vision_config(),
+        'model': args.model,
+        'backend': args.backend,
+        'fixtures': {},
+    }
+    # Both modes run the same model; the pipeline uses it from its capture thread
+    counter = PeopleCounter(args.model, backend=args.backend)
+    for name, video, labels in fixtures:
+        print(f"Benchmarking {name}{' (labeled)' if labels else ''}...")
+        report['fixtures'][name] = {}
+        if args.mode in ('counter', 'both'):
+            result = bench_counter(counter, video, labels, args.every_n, args.max_frames)
+            report['fixtures'][name]['counter'] = result
+            print(f"  counter:  {result['fps']:.1f} frames/sec, "
+                  f"p95 {result['latency'].get('p95_ms', 0):.1f} ms")
+        if args.mode in ('pipeline', 'both'):
+            result = bench_pipeline(video, labels, args.max_seconds, counter)
+            report['fixtures'][name]['pipeline'] = result
+            print(f"  pipeline: {result['display_fps']:.1f} frames/sec displayed, "
+                  f"p95 latency {result['frame_latency'].get('p95_ms', 0):.1f} ms")
+        for mode, result in report['fixtures'][name].items():
+            if result.get('accuracy'):
+                print(f"  {mode} accuracy: MAE {result['accuracy']['mae']:.2f}, "
+                      f"exact {result['accuracy']['exact_match_rate']:.1%}")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    output = os.path.join(args.output_dir, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            print_comparison(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Build a small labeled fixture for testing/benchmark.py.
+
+Recorded classroom videos can't be committed (testing/fixtures/ is ignored),
+so this writes a short synthetic clip from the sample images that ship with
+ultralytics: a scene with 4 people, one with 2 and an empty one, each held
+for a few seconds. The labels are written next to it in the benchmark's
+format, so a fresh checkout can run an accuracy check right away.
+
+Usage:
+    python testing/fetch_fixtures.py
+    python testing/fetch_fixtures.py --output testing/fixtures --seconds 5
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+from ultralytics.utils import ASSETS
+
+# (image in the ultralytics assets, people in it); None = empty scene
+SCENES = [
+    ('bus.jpg', 4),
+    ('zidane.jpg', 2),
+    (None, 0),
+]
+
+
+def letterbox(image, width, height):
+    """Fit an image into a width x height gray canvas without distorting it."""
+    canvas = np.full((height, width, 3), 114, dtype=np.uint8)
+    if image is None:
+        return canvas
+    h, w = image.shape[:2]
+    scale = min(width / w, height / h)
+    new_w, new_h = int(w * scale), int(h * scale)
+    x, y = (width - new_w) // 2, (height - new_h) // 2
+    canvas[y:y + new_h, x:x + new_w] = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    return canvas
+
+
+def build_sample(output_dir, seconds=4, fps=15, width=1280, height=720, name='sample'):
+    """
+    Write <name>.mp4 and <name>.json (labels every second) into output_dir.
+
+    Returns:
+        str: Path of the video
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    video_path = os.path.join(output_dir, f"{name}.mp4")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open a video writer for {video_path}")
+
+    counts = {}
+    index = 0
+    for image_name, people in SCENES:
+        image = cv2.imread(str(ASSETS / image_name)) if image_name else None
+        if image_name and image is None:
+            raise FileNotFoundError(f"{image_name} not found in {ASSETS}")
+        frame = letterbox(image, width, height)
+        for _ in range(seconds * fps):
+            writer.write(frame)
+            if index % fps == 0:
+                counts[str(index)] = people
+            index += 1
+    writer.release()
+
+    with open(os.path.join(output_dir, f"{name}.json"), 'w') as f:
+        json.dump({'counts': counts}, f, indent=2)
+    return video_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create a labeled sample clip for the benchmark")
+    parser.add_argument('--output', default='testing/fixtures', help="Directory to write the fixture to")
+    parser.add_argument('--seconds', type=int, default=4, help="Seconds each scene is held")
+    parser.add_argument('--fps', type=int, default=15)
+    args = parser.parse_args()
+
+    video = build_sample(args.output, args.seconds, args.fps)
+    print(f"Fixture written to {video}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Quantization report - compares the FP32 model against its INT8 variant on
+recorded classroom frames: people-count error and frames/sec.
+
+Usage:
+    python testing/quantization_report.py --images calibration/holdout --labels counts.json
+    python testing/quantization_report.py --video recordings/room101.mp4
+
+counts.json maps image file names to the true number of people. Without
+labels, the FP32 model's counts are used as the reference. The report is
+printed and written as JSON (default: quantization_report.json).
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+from vision.yolo_people_counter import PeopleCounter
+from testing.backend_parity import load_frames, run_counter
+
+
+def count_errors(predicted, reference):
+    """Mean absolute error, max error and exact-match rate of people counts."""
+    errors = [abs(p - r) for p, r in zip(predicted, reference)]
+    return {
+        'mae': sum(errors) / len(errors) if errors else 0.0,
+        'max_error': max(errors, default=0),
+        'exact_match_rate': sum(1 for e in errors if e == 0) / len(errors) if errors else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FP32 vs INT8 people counter report")
+    parser.add_argument('--model', default='best.pt')
+    parser.add_argument('--video', help="Video file to sample frames from")
+    parser.add_argument('--images', help="Directory of .jpg/.png frames")
+    parser.add_argument('--labels', help="JSON file mapping image file names to true counts")
+    parser.add_argument('--every-n', type=int, default=10)
+    parser.add_argument('--max-frames', type=int, default=200)
+    parser.add_argument('--output', default='quantization_report.json')
+    args = parser.parse_args()
+
+    ground_truth = None
+    if args.images and args.labels:
+        with open(args.labels, 'r') as f:
+            labels = json.load(f)
+        names = sorted(name for name in labels if os.path.exists(os.path.join(args.images, name)))
+        names = names[:args.max_frames]
+        frames = [cv2.imread(os.path.join(args.images, name)) for name in names]
+        ground_truth = [int(labels[name]) for name in names]
+    else:
+        frames = load_frames(args.video, args.images, args.every_n, args.max_frames)
+
+    if not frames:
+        print("No frames to evaluate! Pass --video or --images.")
+        return 1
+
+    print(f"Evaluating FP32 and INT8 models on {len(frames)} frames...")
+    fp32_counts, fp32_fps = run_counter(PeopleCounter(args.model, backend='torch'), frames)
+    int8_counts, int8_fps = run_counter(PeopleCounter(args.model, backend='openvino-int8'), frames)
+
+    reference = ground_truth if ground_truth is not None else fp32_counts
+    report = {
+        'created': datetime.now().isoformat(),
+        'model': args.model,
+        'frames': len(frames),
+        'reference': 'labels' if ground_truth is not None else 'fp32',
+        'fp32': {'fps': fp32_fps, **count_errors(fp32_counts, reference)},
+        'int8': {'fps': int8_fps, **count_errors(int8_counts, reference)},
+    }
+    report['speedup'] = int8_fps / fp32_fps if fp32_fps else 0.0
+
+    print(f"{'':<6}{'frames/sec':>12}{'count MAE':>12}{'max error':>12}{'exact':>10}")
+    for name in ('fp32', 'int8'):
+        row = report[name]
+        print(f"{name:<6}{row['fps']:>12.1f}{row['mae']:>12.2f}{row['max_error']:>12}{row['exact_match_rate']:>10.1%}")
+    print(f"INT8 speedup: {report['speedup']:.2f}x (errors measured against {report['reference']})")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
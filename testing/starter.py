@@ -4,11 +4,72 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from vision.yolo_people_counter import PeopleCounter
 from vision.iphone import get_available_cameras, switch_camera, initialize_camera
+from vision.video_source import VideoSource
+import argparse
+import time
 import cv2
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="EduVision people counter")
+    parser.add_argument('--headless', action='store_true',
+                        help="Count only: no window, no annotation, print counts to the console")
+    parser.add_argument('--print-interval', type=float, default=1.0,
+                        help="Seconds between count reports in headless mode")
+    parser.add_argument('--source', action='append', default=[],
+                        help="Camera index, RTSP/HTTP URL or video file; repeat to count several "
+                             "sources headless with one batched model")
+    return parser.parse_args()
+
+def count_sources(counter, sources, print_interval=1.0):
+    """
+    Headless counting over any number of sources with one model.
+    
+    Every source decodes in its own thread (reconnecting streams that drop);
+    the newest frame of each is collected and inferred as one batch.
+    """
+    video_sources = [VideoSource(source) for source in sources]
+    counts = {source.name: 0 for source in video_sources}
+    last_report = 0
+    try:
+        while any(not source.failed for source in video_sources):
+            names = []
+            handles = []
+            for source in video_sources:
+                ret, handle = source.read(timeout=0.05)
+                if ret:
+                    names.append(source.name)
+                    handles.append(handle)
+            if not handles:
+                continue
+            
+            results = counter.detect_batch([handle.array for handle in handles])
+            for name, handle, detections in zip(names, handles, results):
+                counts[name] = detections['count']
+                handle.release()
+            
+            now = time.time()
+            if now - last_report >= print_interval:
+                report = "  ".join(f"{name}: {count}" for name, count in counts.items())
+                print(f"{report}  FPS: {counter.fps:.1f}")
+                last_report = now
+    except KeyboardInterrupt:
+        print("\nStopping people counter...")
+    finally:
+        for source in video_sources:
+            source.close()
+
 def main():
     """Main function to run the people counter"""
-    print("Press 'q' to quit, 'r' to reset counter, 'c' to change camera")
+    args = parse_args()
+    if args.source:
+        print(f"Counting {len(args.source)} source(s) headless: press Ctrl+C to quit")
+        count_sources(PeopleCounter(), args.source, args.print_interval)
+        return
+    
+    if args.headless:
+        print("Headless mode: press Ctrl+C to quit")
+    else:
+        print("Press 'q' to quit, 'r' to reset counter, 'c' to change camera")
     
     # Get all available cameras
     available_cameras = get_available_cameras()
@@ -33,6 +94,7 @@ def main():
     print("Camera initialized successfully!")
     print("People detection and counting started...")
     
+    last_report = 0
     try:
         while True:
             ret, frame = cap.read()
@@ -40,6 +102,15 @@ def main():
                 print("Error: Cannot read from camera.")
                 break
             
+            if args.headless:
+                # Counting-only path: nothing is drawn or displayed
+                detections = counter.detect(frame)
+                now = time.time()
+                if now - last_report >= args.print_interval:
+                    print(f"People: {detections['count']}  FPS: {counter.fps:.1f}")
+                    last_report = now
+                continue
+            
             # Detect and count people
             annotated_frame = counter.detect_and_count(frame, current_camera_index, available_cameras)
             
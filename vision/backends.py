@@ -0,0 +1,182 @@
+"""
+Inference backends for the people counter.
+
+Our room nodes are CPU-only, where exported ONNX or OpenVINO models run
+noticeably faster than the PyTorch weights. ultralytics loads exported models
+through the same YOLO() interface and returns the same Results objects, so
+PeopleCounter's person filtering and counting stay identical whichever
+backend is selected. The onnxruntime / openvino packages are only needed for
+the backend actually in use.
+"""
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from ultralytics import YOLO
+
+CONFIG_FILE = "vision/config.json"
+
+# A lock file older than this belongs to an export that died
+STALE_LOCK_SECONDS = 600
+_export_lock = threading.Lock()
+
+# backend name -> ultralytics export format
+BACKENDS = {
+    'torch': None,
+    'onnx': 'onnx',
+    'openvino': 'openvino',
+    'openvino-int8': 'openvino',  # post-training quantized, see vision/quantize.py
+}
+
+DEFAULT_CONFIG = {
+    'model_path': 'best.pt',
+    'backend': 'torch',
+    'imgsz': 640,
+    'inference_workers': 0,  # >0: run the camera page's detection in worker processes
+    'telemetry': {},  # see vision/telemetry.py
+}
+
+
+def load_vision_config(config_file=CONFIG_FILE):
+    """
+    Load vision settings, falling back to defaults for anything missing.
+
+    Returns:
+        dict of settings
+    """
+    config = dict(DEFAULT_CONFIG)
+    try:
+        if os.path.exists(config_file):
+            with open(config_file, 'r') as f:
+                config.update(json.load(f))
+    except Exception as e:
+        print(f"Error loading vision config: {e}")
+    return config
+
+
+def exported_model_path(model_path, backend):
+    """
+    Path where ultralytics writes the export of model_path for a backend.
+
+    Args:
+        model_path: Path to the .pt weights
+        backend: One of BACKENDS
+
+    Returns:
+        str: Model path to load for that backend
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {list(BACKENDS)}")
+    if backend == 'torch':
+        return model_path
+
+    stem = os.path.splitext(model_path)[0]
+    if backend == 'onnx':
+        return f"{stem}.onnx"
+    if backend == 'openvino-int8':
+        return f"{stem}_int8_openvino_model"
+    return f"{stem}_openvino_model"
+
+
+def export_model(model_path='best.pt', backend='onnx', imgsz=640, **export_args):
+    """
+    Export PyTorch weights to a CPU runtime format.
+
+    Args:
+        model_path: Path to the .pt weights
+        backend: 'onnx', 'openvino' or 'openvino-int8' (needs data=calibration yaml)
+        imgsz: Inference image size baked into the export
+        **export_args: Extra arguments for YOLO.export (e.g. int8=True, data=...)
+
+    Returns:
+        str: Path of the exported model
+    """
+    export_format = BACKENDS.get(backend)
+    if export_format is None:
+        raise ValueError(f"Backend '{backend}' cannot be exported to")
+    if backend == 'openvino-int8':
+        export_args['int8'] = True
+    # The engine, tiling and batch jobs send several images per forward pass;
+    # a static export would only accept a batch of 1
+    export_args.setdefault('dynamic', True)
+
+    print(f"Exporting '{model_path}' to {backend}...")
+    path = exported_model_path(model_path, backend)
+    # Export from a private copy of the weights and move the result into place,
+    # so a reader never sees a half-written model
+    work_dir = tempfile.mkdtemp(prefix='.export-', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        source = model_path
+        if os.path.isfile(model_path):
+            source = os.path.join(work_dir, os.path.basename(model_path))
+            shutil.copyfile(model_path, source)
+        exported = str(YOLO(source).export(format=export_format, imgsz=imgsz, **export_args))
+        if os.path.abspath(exported) != os.path.abspath(path):
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.replace(exported, path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(f"Exported model written to {path}")
+    return path
+
+
+@contextlib.contextmanager
+def _export_guard(path):
+    """Hold the export of path against other threads and processes (lock file next to it)."""
+    lock_path = path + '.lock'
+    with _export_lock:
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+                        os.remove(lock_path)
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.5)
+        try:
+            os.close(fd)
+            yield
+        finally:
+            os.remove(lock_path)
+
+
+def resolve_model_path(model_path='best.pt', backend='torch', imgsz=640, export_if_missing=True):
+    """
+    Get the model path to load for a backend, exporting the weights first if needed.
+
+    Returns:
+        str: Path to pass to YOLO()
+    """
+    path = exported_model_path(model_path, backend)
+    if backend != 'torch' and not os.path.exists(path):
+        if backend == 'openvino-int8':
+            # Quantization needs calibration frames, it can't be done implicitly
+            raise FileNotFoundError(f"No INT8 model at '{path}', create it with python -m vision.quantize")
+        if not export_if_missing:
+            raise FileNotFoundError(f"No {backend} export of '{model_path}' at '{path}'")
+        # The preload thread, camera threads and pool workers can all get here
+        # at once: only the first one exports, the others wait and reuse it
+        with _export_guard(path):
+            if not os.path.exists(path):
+                path = export_model(model_path, backend, imgsz=imgsz)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export the people counter model for a CPU runtime")
+    parser.add_argument('backend', choices=['onnx', 'openvino'])
+    parser.add_argument('--model', default=DEFAULT_CONFIG['model_path'])
+    parser.add_argument('--imgsz', type=int, default=DEFAULT_CONFIG['imgsz'])
+    args = parser.parse_args()
+
+    export_model(args.model, args.backend, imgsz=args.imgsz)
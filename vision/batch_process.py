@@ -0,0 +1,196 @@
+"""
+Offline batch processing of recorded classroom video into raw_data.
+
+Turns hours of recorded footage into occupancy history much faster than
+realtime: the video is split into segments that worker processes decode in
+parallel, only every Nth second is decoded in full (the frames in between
+are skipped with grab()), sampled frames go through batched PeopleCounter
+inference, and the counts are written to raw_data in bulk.
+
+    python -m vision.batch_process recordings/room101.mp4 --room 12 --start "2024-10-21 08:00:00"
+
+Without --start the recording is assumed to have ended at the file's
+modification time.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import time
+from datetime import datetime, timedelta
+import cv2
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_counter = None  # PeopleCounter of the current worker process
+
+
+def _init_worker(model_path, room_settings):
+    """Load one PeopleCounter per worker process."""
+    global _counter
+    from vision.yolo_people_counter import PeopleCounter
+
+    # Workers already run in parallel, keep OpenCV from oversubscribing the CPU
+    cv2.setNumThreads(1)
+    _counter = PeopleCounter(model_path=model_path)
+    _counter.set_room(room_settings)
+
+
+def _infer(frames):
+    return _counter.detect_batch(frames, [_counter.region] * len(frames), [_counter.tiles] * len(frames))
+
+
+def process_segment(video_path, start_frame, end_frame, step, batch_size):
+    """
+    Count people on every `step`-th frame of one segment of a video.
+
+    Runs in a worker process.
+
+    Returns:
+        tuple: (list of (frame_index, count), frames decoded, frames inferred)
+    """
+    cap = cv2.VideoCapture(video_path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    results = []
+    frame_indices = []
+    frames = []
+    decoded = 0
+
+    index = start_frame
+    while index < end_frame:
+        if not cap.grab():
+            break
+        decoded += 1
+        if index % step == 0:
+            ret, frame = cap.retrieve()
+            if ret:
+                frame_indices.append(index)
+                frames.append(frame)
+        if len(frames) >= batch_size:
+            results.extend(zip(frame_indices, (d['count'] for d in _infer(frames))))
+            frame_indices, frames = [], []
+        index += 1
+
+    if frames:
+        results.extend(zip(frame_indices, (d['count'] for d in _infer(frames))))
+    cap.release()
+    return results, decoded, len(results)
+
+
+def _process_segment_task(args):
+    return process_segment(*args)
+
+
+def video_info(video_path):
+    """
+    Returns:
+        tuple: (frame count, frames per second)
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Could not open video '{video_path}'")
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    cap.release()
+    if frame_count <= 0:
+        raise ValueError(f"Video '{video_path}' reports no frame count, re-mux it first (e.g. ffmpeg -c copy)")
+    return frame_count, fps
+
+
+def process_video(video_path, room_id, db=None, start_time=None, sample_every=1.0, workers=2,
+                  batch_size=16, segment_seconds=300, model_path=None):
+    """
+    Count people in a recorded video and store the counts in raw_data.
+
+    Args:
+        video_path: Video file to process
+        room_id: Room the recording belongs to
+        db: Database to write to (None = only return the rows)
+        start_time: datetime of the first frame (default: file mtime minus duration)
+        sample_every: Seconds of video between counted frames
+        workers: Number of worker processes
+        batch_size: Frames per batched inference call
+        segment_seconds: Length of the video chunks handed to workers
+        model_path: Model weights (default: vision/config.json)
+
+    Returns:
+        dict with the rows written and throughput figures
+    """
+    from vision.room_config import get_room_settings
+
+    frame_count, fps = video_info(video_path)
+    duration = frame_count / fps
+    if start_time is None:
+        start_time = datetime.fromtimestamp(os.path.getmtime(video_path)) - timedelta(seconds=duration)
+
+    step = max(1, int(round(fps * sample_every)))
+    segment_frames = max(step, int(round(fps * segment_seconds)) // step * step)
+    tasks = [(video_path, start, min(start + segment_frames, frame_count), step, batch_size)
+             for start in range(0, frame_count, segment_frames)]
+
+    print(f"Processing {video_path}: {duration / 60:.1f} min at {fps:.1f} fps, "
+          f"{len(tasks)} segments on {workers} workers")
+
+    rows = []
+    decoded = 0
+    inferred = 0
+    start = time.time()
+    context = mp.get_context('spawn')
+    with context.Pool(workers, initializer=_init_worker,
+                      initargs=(model_path, get_room_settings(room_id))) as pool:
+        for results, segment_decoded, segment_inferred in pool.imap_unordered(_process_segment_task, tasks):
+            segment_rows = [
+                (room_id, (start_time + timedelta(seconds=index / fps)).strftime(TIMESTAMP_FORMAT), count)
+                for index, count in results
+            ]
+            if db is not None:
+                # One transaction per segment, so progress survives an interrupted run
+                db.save_snapshots(segment_rows)
+            rows.extend(segment_rows)
+            decoded += segment_decoded
+            inferred += segment_inferred
+            elapsed = time.time() - start
+            print(f"  {decoded}/{frame_count} frames, {decoded / elapsed:.0f} decoded/s, "
+                  f"{inferred / elapsed:.1f} inferred/s")
+
+    elapsed = time.time() - start
+    report = {
+        'rows': len(rows),
+        'elapsed': elapsed,
+        'decoded_fps': decoded / elapsed if elapsed > 0 else 0.0,
+        'inferred_fps': inferred / elapsed if elapsed > 0 else 0.0,
+        'realtime_factor': duration / elapsed if elapsed > 0 else 0.0,
+    }
+    print(f"Wrote {report['rows']} snapshots in {elapsed:.1f}s "
+          f"({report['decoded_fps']:.0f} frames/sec, {report['realtime_factor']:.1f}x realtime)")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count people in recorded video and store the counts in raw_data")
+    parser.add_argument('videos', nargs='+', help="Video files of the same room, in recording order")
+    parser.add_argument('--room', type=int, required=True, help="room_id the recordings belong to")
+    parser.add_argument('--start', help=f"Time of the first frame ({TIMESTAMP_FORMAT}), first video only")
+    parser.add_argument('--sample-every', type=float, default=1.0, help="Seconds between counted frames")
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--model', default=None)
+    parser.add_argument('--db', default="./database/eduvisiondb.db")
+    parser.add_argument('--dry-run', action='store_true', help="Count only, don't write to the database")
+    args = parser.parse_args()
+
+    from database.db_repository import Database
+
+    db = None if args.dry_run else Database(args.db)
+    start_time = datetime.strptime(args.start, TIMESTAMP_FORMAT) if args.start else None
+    try:
+        for video in args.videos:
+            process_video(video, args.room, db, start_time, args.sample_every, args.workers,
+                          args.batch_size, model_path=args.model)
+            start_time = None
+    finally:
+        if db is not None:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
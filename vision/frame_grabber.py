@@ -0,0 +1,181 @@
+import threading
+import time
+import cv2
+from vision.frame_pool import FrameHandle
+
+
+class FrameGrabber:
+    """
+    Dedicated capture thread that keeps only the newest frame.
+
+    cap.read() runs continuously in its own thread and writes into a single
+    latest-frame slot. A frame that is overwritten before anyone consumed it
+    is counted as dropped. Consumers always get the newest frame, so slow
+    inference never makes the count lag behind OpenCV's internal buffer.
+
+    With a FramePool, frames are decoded straight into preallocated buffers
+    and handed out as FrameHandles instead of fresh arrays.
+    """
+
+    def __init__(self, cap, name="camera", frame_pool=None, pace_fps=None):
+        """
+        Initialize the grabber.
+
+        Args:
+            cap: Opened cv2.VideoCapture to read from
+            name: Label used in log messages
+            frame_pool: Optional FramePool to decode frames into
+            pace_fps: Read at most this many frames per second (for video
+                      files, which would otherwise decode as fast as possible)
+        """
+        self.cap = cap
+        self.name = name
+        self.frame_pool = frame_pool
+        self.frame_interval = 1.0 / pace_fps if pace_fps else 0.0
+        self._frame_shape = None
+        self.running = False
+        self.failed = False
+        self.grabber_thread = None
+
+        self._condition = threading.Condition()
+        self._frame = None  # newest FrameHandle not yet consumed
+        self._frame_id = 0
+
+        self.frames_grabbed = 0
+        self.frames_dropped = 0
+
+        # Ask the backend to keep its own queue as short as possible
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    def start(self):
+        """Start grabbing frames in a separate thread."""
+        if not self.running:
+            self.running = True
+            self.failed = False
+            self.grabber_thread = threading.Thread(target=self._run_grabber, daemon=True)
+            self.grabber_thread.start()
+        return self
+
+    def stop(self, release=True):
+        """
+        Stop the grabber thread.
+
+        Args:
+            release: Also release the underlying capture
+        """
+        self.running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self.grabber_thread and self.grabber_thread is not threading.current_thread():
+            self.grabber_thread.join(timeout=2.0)
+        self.grabber_thread = None
+        if release and self.cap is not None and self.cap.isOpened():
+            self.cap.release()
+
+    def _read(self):
+        """
+        Decode one frame, into a pooled buffer when possible.
+
+        Returns:
+            FrameHandle or None on read failure
+        """
+        handle = None
+        if self.frame_pool is not None and self._frame_shape is not None:
+            handle = self.frame_pool.acquire(self._frame_shape)
+
+        if handle is None:
+            ret, frame = self.cap.read()
+            if not ret or frame is None:
+                return None
+            self._frame_shape = frame.shape
+            return FrameHandle(frame)
+
+        ret, frame = self.cap.read(handle.array)
+        if not ret or frame is None:
+            handle.release()
+            return None
+        if frame.ctypes.data != handle.array.ctypes.data:
+            # Resolution changed and OpenCV allocated a new array instead
+            handle.release()
+            self._frame_shape = frame.shape
+            return FrameHandle(frame)
+        return handle
+
+    def _grab(self):
+        """
+        Read one frame and stamp it with its decode time.
+
+        Returns:
+            FrameHandle or None on read failure
+        """
+        start = time.perf_counter()
+        handle = self._read()
+        if handle is not None:
+            handle.capture_time = time.perf_counter() - start
+            handle.captured_at = time.time()
+        return handle
+
+    def _run_grabber(self):
+        """Main capture loop."""
+        next_frame_time = time.time()
+        while self.running:
+            if self.frame_interval:
+                delay = next_frame_time - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                next_frame_time = max(next_frame_time + self.frame_interval, time.time() - self.frame_interval)
+            handle = self._grab()
+            with self._condition:
+                if handle is None:
+                    print(f"Error reading from {self.name}")
+                    self.failed = True
+                    self.running = False
+                    self._condition.notify_all()
+                    break
+
+                if self._frame is not None:
+                    # Nobody consumed the previous frame in time
+                    self._frame.release()
+                    self.frames_dropped += 1
+                self._frame = handle
+                self._frame_id += 1
+                self.frames_grabbed += 1
+                self._condition.notify_all()
+
+        with self._condition:
+            if self._frame is not None:
+                self._frame.release()
+                self._frame = None
+
+    def read(self, timeout=1.0):
+        """
+        Wait for a frame newer than the last one returned and return it.
+
+        Ownership of the frame passes to the caller, who must release() the
+        handle once capture, inference and display are done with it.
+
+        Args:
+            timeout: Seconds to wait for a new frame
+
+        Returns:
+            tuple: (ret, FrameHandle) like cv2.VideoCapture.read()
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._frame is not None or self.failed or not self.running,
+                timeout=timeout
+            )
+            if self._frame is None:
+                return False, None
+            handle = self._frame
+            self._frame = None
+            return True, handle
+
+    def get_stats(self):
+        """Get capture and drop counters."""
+        with self._condition:
+            return {
+                'frames_grabbed': self.frames_grabbed,
+                'frames_dropped': self.frames_dropped,
+                'failed': self.failed,
+            }
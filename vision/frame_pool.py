@@ -0,0 +1,139 @@
+import threading
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class FrameHandle:
+    """
+    Reference-counted handle to a frame buffer.
+
+    Capture, inference and display pass handles around instead of copying
+    the pixels. Whoever holds a reference calls release() when done; the
+    buffer goes back to its pool once the last reference is released.
+    Handles created with pool=None wrap a plain array and never recycle it.
+    """
+
+    def __init__(self, array, pool=None, index=None):
+        self.array = array
+        self.pool = pool
+        self.index = index
+        self._refs = 1
+        self.captured_at = None  # time.time() when the frame was decoded
+        self.capture_time = None  # seconds spent in cap.read()
+
+    def retain(self):
+        """Take an extra reference before handing the frame to another consumer."""
+        if self.pool is not None:
+            with self.pool._lock:
+                self._refs += 1
+        return self
+
+    def release(self):
+        """Drop a reference; the buffer is recycled once nobody holds it."""
+        if self.pool is not None:
+            self.pool._release(self)
+
+
+def as_array(frame):
+    """Return the ndarray behind a FrameHandle, or the frame itself if it already is one."""
+    return frame.array if isinstance(frame, FrameHandle) else frame
+
+
+def release_frame(frame):
+    """Release a FrameHandle; plain arrays are left to the garbage collector."""
+    if isinstance(frame, FrameHandle):
+        frame.release()
+
+
+class FramePool:
+    """
+    Preallocated pool of reusable frame buffers.
+
+    Every buffer is allocated once, either in process memory or in named
+    shared memory so worker processes can read frames without a copy.
+    acquire() hands out a view shaped like the requested frame; at 30 FPS
+    across several cameras this replaces a full 1080p allocation per frame.
+    """
+
+    def __init__(self, num_buffers=8, buffer_bytes=1920 * 1080 * 3, shared=False):
+        """
+        Initialize the pool.
+
+        Args:
+            num_buffers: Number of buffers to preallocate
+            buffer_bytes: Size of each buffer; frames larger than this are not pooled
+            shared: Back the buffers with multiprocessing shared memory
+        """
+        self.num_buffers = num_buffers
+        self.buffer_bytes = int(buffer_bytes)
+        self.shared = shared
+
+        self._lock = threading.Lock()
+        self._shared_blocks = []
+        if shared:
+            self._shared_blocks = [shared_memory.SharedMemory(create=True, size=self.buffer_bytes)
+                                   for _ in range(num_buffers)]
+            self._buffers = [np.ndarray((self.buffer_bytes,), dtype=np.uint8, buffer=block.buf)
+                             for block in self._shared_blocks]
+        else:
+            self._buffers = [np.empty((self.buffer_bytes,), dtype=np.uint8)
+                             for _ in range(num_buffers)]
+        self._free = list(range(num_buffers))
+
+        self.acquired = 0
+        self.misses = 0
+
+    @property
+    def shared_names(self):
+        """Names of the shared-memory blocks, in buffer order (empty if not shared)."""
+        return [block.name for block in self._shared_blocks]
+
+    def acquire(self, shape, dtype=np.uint8):
+        """
+        Take a free buffer shaped for a frame.
+
+        Args:
+            shape: Frame shape, e.g. (480, 640, 3)
+            dtype: Frame dtype
+
+        Returns:
+            FrameHandle holding one reference, or None if the frame does not
+            fit or every buffer is in use
+        """
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        with self._lock:
+            if nbytes > self.buffer_bytes or not self._free:
+                self.misses += 1
+                return None
+            index = self._free.pop()
+            self.acquired += 1
+        array = self._buffers[index][:nbytes].view(dtype).reshape(shape)
+        return FrameHandle(array, pool=self, index=index)
+
+    def _release(self, handle):
+        with self._lock:
+            handle._refs -= 1
+            if handle._refs == 0:
+                self._free.append(handle.index)
+
+    def get_stats(self):
+        """Get pool usage counters."""
+        with self._lock:
+            return {
+                'buffers': self.num_buffers,
+                'free': len(self._free),
+                'acquired': self.acquired,
+                'misses': self.misses,
+            }
+
+    def close(self):
+        """Free the shared-memory blocks (no-op for in-process pools)."""
+        self._buffers = []
+        for block in self._shared_blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass  # a consumer still holds a view; the mapping goes away with it
+            block.unlink()
+        self._shared_blocks = []
@@ -0,0 +1,107 @@
+import time
+
+
+class InferenceCadence:
+    """
+    Decides which captured frames are worth a YOLO pass.
+
+    Occupancy changes on a scale of seconds, so running the model on every
+    frame the camera delivers mostly burns CPU. The cadence can run inference
+    on every Nth frame, cap inference to a target rate, and back off further
+    while the count stays the same. Frames in between are still displayed,
+    with the last detections drawn on them.
+    """
+
+    def __init__(self, every_n_frames=1, target_fps=None, adaptive=False,
+                 stable_after=3, max_backoff=8):
+        """
+        Initialize the cadence.
+
+        Args:
+            every_n_frames: Run inference on every Nth frame (1 = every frame)
+            target_fps: Maximum inferences per second (None = unlimited)
+            adaptive: Back off while the count is stable, reset as soon as it changes
+            stable_after: Number of identical consecutive counts before backing off
+            max_backoff: Largest multiplier applied to the base cadence
+        """
+        self.every_n_frames = max(1, int(every_n_frames))
+        self.target_fps = target_fps
+        self.adaptive = adaptive
+        self.stable_after = max(1, int(stable_after))
+        self.max_backoff = max(1, int(max_backoff))
+
+        self.backoff = 1
+        self.frames_seen = 0
+        self.inferences_run = 0
+        self._frames_since_inference = 0
+        self._last_inference_time = None
+        self._last_count = None
+        self._stable_runs = 0
+
+    def should_infer(self, now=None):
+        """
+        Register a new frame and decide whether it should go through the model.
+
+        Args:
+            now: Current time in seconds (defaults to time.time())
+
+        Returns:
+            bool: True if inference should run on this frame
+        """
+        now = time.time() if now is None else now
+        self.frames_seen += 1
+        self._frames_since_inference += 1
+
+        if self._last_inference_time is None:
+            return True
+
+        if self._frames_since_inference < self.every_n_frames * self.backoff:
+            return False
+
+        if self.target_fps:
+            min_interval = self.backoff / self.target_fps
+            if now - self._last_inference_time < min_interval:
+                return False
+
+        return True
+
+    def record_inference(self, count, now=None):
+        """
+        Report the count produced by an inference so the cadence can adapt.
+
+        Args:
+            count: People count returned by the model
+            now: Current time in seconds (defaults to time.time())
+        """
+        self._last_inference_time = time.time() if now is None else now
+        self._frames_since_inference = 0
+        self.inferences_run += 1
+
+        if self.adaptive:
+            if count == self._last_count:
+                self._stable_runs += 1
+                if self._stable_runs >= self.stable_after:
+                    self.backoff = min(self.backoff * 2, self.max_backoff)
+                    self._stable_runs = 0
+            else:
+                self._stable_runs = 0
+                self.backoff = 1
+
+        self._last_count = count
+
+    def reset(self):
+        """Forget history, e.g. after switching cameras."""
+        self.backoff = 1
+        self._frames_since_inference = 0
+        self._last_inference_time = None
+        self._last_count = None
+        self._stable_runs = 0
+
+    def get_stats(self):
+        """Get frame and inference counters."""
+        return {
+            'frames_seen': self.frames_seen,
+            'inferences_run': self.inferences_run,
+            'frames_skipped': self.frames_seen - self.inferences_run,
+            'backoff': self.backoff,
+        }
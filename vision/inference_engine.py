@@ -0,0 +1,162 @@
+import threading
+from vision.yolo_people_counter import PeopleCounter
+from vision.frame_pool import as_array, release_frame
+
+
+class InferenceEngine:
+    """
+    Shared inference engine for several capture sources.
+
+    Every capture source submits its latest frame; once per tick the engine
+    gathers the pending frames of all registered sources into a single batched
+    YOLO call (one per inference size in use) and hands each source its own
+    counts and boxes back. One model
+    instance serves every room instead of one model per CameraThread.
+
+    Frames may be plain arrays or FrameHandles. A submitted frame is owned by
+    the engine until it is passed to the source's callback (or released if a
+    newer frame replaces it).
+    """
+
+    def __init__(self, people_counter=None, max_batch_size=16, idle_wait=0.1):
+        """
+        Initialize the inference engine.
+
+        Args:
+            people_counter: PeopleCounter to run inference with (created if omitted)
+            max_batch_size: Maximum number of frames sent to the model per forward pass
+            idle_wait: Seconds to wait for new frames before re-checking the running flag
+        """
+        self.people_counter = people_counter if people_counter is not None else PeopleCounter()
+        self.max_batch_size = max_batch_size
+        self.idle_wait = idle_wait
+        self.running = False
+        self.engine_thread = None
+
+        self._lock = threading.Lock()
+        self._frame_available = threading.Event()
+        self._pending_frames = {}  # source_id -> (newest frame not yet inferred, region, imgsz, tiles)
+        self._callbacks = {}       # source_id -> callback(frame, detections)
+
+    @property
+    def fps(self):
+        """Frames per second inferred across all sources."""
+        return self.people_counter.fps
+
+    def register_source(self, source_id, callback):
+        """
+        Register a capture source.
+
+        Args:
+            source_id: Unique identifier for the source (camera index, room id, ...)
+            callback: Called as callback(frame, detections) from the engine thread;
+                      the callback takes ownership of the frame
+        """
+        with self._lock:
+            self._callbacks[source_id] = callback
+
+    def unregister_source(self, source_id):
+        """Remove a capture source and drop any frame it still has pending."""
+        with self._lock:
+            self._callbacks.pop(source_id, None)
+            pending = self._pending_frames.pop(source_id, None)
+            if pending is not None:
+                release_frame(pending[0])
+
+    def submit_frame(self, source_id, frame, region=None, imgsz=None, tiles=None):
+        """
+        Hand the engine the latest frame of a source.
+
+        A frame that has not been inferred yet is replaced, so a slow tick
+        never builds up a backlog for any camera.
+
+        Args:
+            source_id: Registered source identifier
+            frame: ndarray or FrameHandle
+            region: Optional RoomRegion to restrict detection to
+            imgsz: Optional inference image size for this frame
+            tiles: Optional (rows, cols, overlap) for sliced inference of this frame
+
+        Returns:
+            bool: True if the frame was queued
+        """
+        with self._lock:
+            if source_id not in self._callbacks:
+                return False
+            replaced = self._pending_frames.get(source_id)
+            if replaced is not None:
+                release_frame(replaced[0])
+            self._pending_frames[source_id] = (frame, region, imgsz, tiles)
+        self._frame_available.set()
+        return True
+
+    def start(self):
+        """Start the engine in a separate thread."""
+        if not self.running:
+            self.running = True
+            self.engine_thread = threading.Thread(target=self._run_engine, daemon=True)
+            self.engine_thread.start()
+
+    def stop(self):
+        """Stop the engine thread."""
+        self.running = False
+        self._frame_available.set()
+        if self.engine_thread:
+            self.engine_thread.join()
+            self.engine_thread = None
+
+    def _run_engine(self):
+        """Main engine loop."""
+        while self.running:
+            if not self._frame_available.wait(self.idle_wait):
+                continue
+            self._frame_available.clear()
+            self.process_tick()
+
+    def process_tick(self):
+        """
+        Run one batched inference over every pending frame.
+
+        Frames are batched by inference size, since a forward pass runs all
+        its images at one size.
+
+        Returns:
+            int: Number of frames processed
+        """
+        with self._lock:
+            pending = self._pending_frames
+            self._pending_frames = {}
+
+        if not pending:
+            return 0
+
+        by_size = {}
+        for source_id, (_, _, imgsz, _) in pending.items():
+            by_size.setdefault(self.people_counter.inference_size(imgsz), []).append(source_id)
+
+        chunks = [(imgsz, source_ids[start:start + self.max_batch_size])
+                  for imgsz, source_ids in by_size.items()
+                  for start in range(0, len(source_ids), self.max_batch_size)]
+        for imgsz, chunk in chunks:
+            frames = [pending[source_id][0] for source_id in chunk]
+            regions = [pending[source_id][1] for source_id in chunk]
+            tiles = [pending[source_id][3] for source_id in chunk]
+
+            try:
+                batch = self.people_counter.detect_batch([as_array(frame) for frame in frames], regions, tiles,
+                                                         imgsz)
+            except Exception as e:
+                print(f"Error running batched inference: {e}")
+                for frame in frames:
+                    release_frame(frame)
+                continue
+
+            for source_id, frame, detections in zip(chunk, frames, batch):
+                with self._lock:
+                    callback = self._callbacks.get(source_id)
+                if callback is not None:
+                    callback(frame, detections)
+                else:
+                    release_frame(frame)
+
+        return len(pending)
@@ -1,37 +1,201 @@
+import glob
+import json
+import re
+import sys
+import threading
+import time
 import cv2
 
-def detect_available_cameras():
+INVENTORY_FILE = "vision/camera_inventory.json"
+PROBE_INDICES = range(5)
+
+_inventory_lock = threading.Lock()
+
+
+def probe_camera(index, timeout=2.0):
+    """
+    Check whether a camera index opens and delivers a frame.
+    
+    The probe runs in its own thread so an index that hangs in the driver
+    costs at most `timeout` seconds instead of blocking the caller.
+    
+    Args:
+        index: Camera index to probe
+        timeout: Seconds to wait for the camera
+    
+    Returns:
+        bool: True if a frame could be read
+    """
+    result = {}
+    
+    def _probe():
+        cap = cv2.VideoCapture(index)
+        try:
+            if cap.isOpened():
+                ret, frame = cap.read()
+                result['ok'] = ret and frame is not None
+        finally:
+            cap.release()
+    
+    thread = threading.Thread(target=_probe, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return result.get('ok', False)
+
+def detect_available_cameras(indices=PROBE_INDICES, timeout=2.0):
     """
     Detect all available cameras and return their indices.
     
+    All indices are probed concurrently, each with its own timeout.
+    
+    Args:
+        indices: Camera indices to probe
+        timeout: Seconds allowed per camera
+    
     Returns:
         list of available camera indices
     """
-    available_cameras = []
-    print("Scanning for available cameras...")
-    
-    # Check indices 0-5 for available cameras (reduced range to avoid errors)
-    for i in range(5):
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            ret, frame = cap.read()
-            if ret and frame is not None:
-                available_cameras.append(i)
-                print(f"  📱 Camera found at index {i}")
-            cap.release()
-        else:
-            cap.release()
+    indices = list(indices)
+    if not indices:
+        return []
+    print(f"Scanning for available cameras ({', '.join(map(str, indices))})...")
+    
+    results = {}
     
+    def _probe(index):
+        results[index] = probe_camera(index, timeout)
+    
+    threads = [threading.Thread(target=_probe, args=(index,), daemon=True) for index in indices]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout + 0.5)
+    
+    available_cameras = sorted(index for index in indices if results.get(index))
+    for index in available_cameras:
+        print(f"  📱 Camera found at index {index}")
     return available_cameras
 
-def get_available_cameras():
+def device_signature():
+    """
+    Cheap fingerprint of the attached video devices, without opening any.
+    
+    Returns:
+        list of /dev/videoN numbers on Linux, None where devices can't be listed
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    numbers = []
+    for path in glob.glob('/dev/video*'):
+        match = re.fullmatch(r'/dev/video(\d+)', path)
+        if match:
+            numbers.append(int(match.group(1)))
+    return sorted(numbers)
+
+def load_camera_inventory(path=INVENTORY_FILE):
+    """Load the cached camera inventory (None if missing or unreadable)."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_camera_inventory(cameras, signature, path=INVENTORY_FILE):
+    """Persist the camera inventory for the next start."""
+    inventory = {'cameras': cameras, 'signature': signature, 'updated': time.time()}
+    try:
+        with open(path, 'w') as f:
+            json.dump(inventory, f, indent=2)
+    except OSError as e:
+        print(f"Could not save camera inventory: {e}")
+    return inventory
+
+def refresh_camera_inventory(in_use=(), full=False, path=INVENTORY_FILE):
+    """
+    Bring the camera inventory up to date and save it.
+    
+    On Linux only device nodes that appeared since the last scan are
+    probed and vanished ones are dropped (hotplug). Elsewhere, or with
+    full=True, every index is probed again. Cameras in `in_use` are kept
+    without probing, since an open camera may refuse a second open.
+    
+    Args:
+        in_use: Camera indices currently opened by this process
+        full: Ignore the cache and probe everything
+    
+    Returns:
+        list of available camera indices
+    """
+    with _inventory_lock:
+        inventory = None if full else load_camera_inventory(path)
+        signature = device_signature()
+        in_use = set(in_use)
+        
+        if inventory is not None and signature is not None and inventory.get('signature') is not None:
+            previous = set(inventory['signature'])
+            added = [index for index in signature if index not in previous and index not in in_use]
+            kept = [index for index in inventory['cameras'] if index in signature]
+            cameras = sorted(set(kept) | (in_use & set(signature)) | set(detect_available_cameras(added)))
+        else:
+            candidates = [index for index in PROBE_INDICES if index not in in_use]
+            cameras = sorted(set(detect_available_cameras(candidates)) | in_use)
+        
+        save_camera_inventory(cameras, signature, path)
+        return cameras
+
+def refresh_camera_inventory_async(callback=None, in_use=(), full=False):
+    """
+    Refresh the inventory in a background thread.
+    
+    Args:
+        callback: Called with the new list of camera indices
+        in_use: Camera indices currently opened by this process
+        full: Probe every index instead of only new devices
+    
+    Returns:
+        threading.Thread running the refresh
+    """
+    def _refresh():
+        cameras = refresh_camera_inventory(in_use, full)
+        if callback is not None:
+            callback(cameras)
+    
+    thread = threading.Thread(target=_refresh, daemon=True)
+    thread.start()
+    return thread
+
+def get_cached_cameras(path=INVENTORY_FILE):
+    """
+    Camera indices from the inventory cache, without probing any device.
+    
+    Returns:
+        list of camera indices (empty when nothing has been cached yet)
+    """
+    inventory = load_camera_inventory(path)
+    return list(inventory['cameras']) if inventory is not None else []
+
+def get_available_cameras(refresh=False, max_age=7 * 24 * 3600):
     """
     Get list of available cameras without user interaction.
     
+    Returns the cached inventory when the attached devices haven't changed
+    since the last scan, so starting a camera doesn't rescan known hardware.
+    
+    Args:
+        refresh: Force a full rescan
+        max_age: Seconds after which the cache is rescanned anyway
+    
     Returns:
         list of available camera indices
     """
-    return detect_available_cameras()
+    if not refresh:
+        inventory = load_camera_inventory()
+        if inventory is not None and time.time() - inventory.get('updated', 0) < max_age:
+            if inventory.get('signature') == device_signature():
+                return list(inventory['cameras'])
+            # Devices were plugged in or out: probe only what changed
+            return refresh_camera_inventory()
+    return refresh_camera_inventory(full=True)
 
 
 def cycle_camera(current_index, available_cameras):
@@ -56,6 +220,20 @@ def cycle_camera(current_index, available_cameras):
         # Current camera not in list, return first available
         return available_cameras[0]
 
+def configure_capture(cap, width=640, height=480, fps=30):
+    """
+    Request a capture resolution and frame rate from the camera.
+    
+    Args:
+        cap: Opened cv2.VideoCapture
+        width: Frame width in pixels
+        height: Frame height in pixels
+        fps: Frames per second
+    """
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+
 def initialize_camera(camera_index=None):
     """
     Initialize camera at specified index or automatically use first available camera.
@@ -91,9 +269,7 @@ def initialize_camera(camera_index=None):
         return None
     
     # Set camera properties for better performance
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    cap.set(cv2.CAP_PROP_FPS, 30)
+    configure_capture(cap)
     
     print(f"Camera at index {camera_index} connected successfully!")
     return cap
@@ -144,9 +320,7 @@ def switch_camera(current_cap=None, current_index=None, available_cameras=None):
         return None, None
     
     # Set camera properties for better performance
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    cap.set(cv2.CAP_PROP_FPS, 30)
+    configure_capture(cap)
     
     print(f"Camera at index {next_index} connected successfully!")
     return cap, next_index
@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+import numpy as np
+from ultralytics import YOLO
+
+
+class ModelHandle:
+    """
+    Shared, inference-safe handle to a loaded YOLO model.
+
+    The ultralytics predictor keeps per-call state, so calls through one
+    handle are serialized with a lock. Every PeopleCounter built with the
+    same model settings shares a single handle.
+    """
+
+    def __init__(self, model, key):
+        self.model = model
+        self.key = key
+        self._lock = threading.Lock()
+
+    def __call__(self, source, **kwargs):
+        """Run inference exactly like calling the YOLO model directly."""
+        with self._lock:
+            return self.model(source, **kwargs)
+
+    @property
+    def names(self):
+        """Class id to class name mapping of the underlying model."""
+        return self.model.names
+
+
+_models = {}
+_registry_lock = threading.Lock()
+
+
+def _model_key(model_path, settings):
+    path = model_path if not os.path.exists(model_path) else os.path.abspath(model_path)
+    return (path, tuple(sorted(settings.items())))
+
+
+def get_model(model_path='best.pt', warmup=True, warmup_shape=(480, 640, 3), **settings):
+    """
+    Get the process-wide shared handle for a model, loading it on first use.
+
+    The first request loads the weights from disk and, if asked, runs one
+    dummy inference so the first real frame doesn't pay for lazy
+    initialization. Later requests with the same path and settings return the
+    cached handle immediately.
+
+    Args:
+        model_path: Path to the YOLO model file
+        warmup: Run a warmup inference after loading
+        warmup_shape: Shape of the blank frame used for warmup
+        **settings: Extra keyword arguments passed to YOLO(), part of the cache key
+
+    Returns:
+        ModelHandle
+    """
+    key = _model_key(model_path, settings)
+    with _registry_lock:
+        handle = _models.get(key)
+        if handle is not None:
+            return handle
+
+        start_time = time.time()
+        model = YOLO(model_path, **settings)
+        if warmup:
+            try:
+                model(np.zeros(warmup_shape, dtype=np.uint8), verbose=False)
+            except Exception as e:
+                # Some exported models only accept their export size; the first real call warms them
+                print(f"Warmup of '{model_path}' skipped: {e}")
+        print(f"Loaded model '{model_path}' in {time.time() - start_time:.2f}s")
+
+        handle = ModelHandle(model, key)
+        _models[key] = handle
+        return handle
+
+
+def clear_models():
+    """Drop every cached model (e.g. after replacing the weights on disk)."""
+    with _registry_lock:
+        _models.clear()
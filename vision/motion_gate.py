@@ -0,0 +1,107 @@
+import time
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap pre-filter that skips inference while the scene is unchanged.
+
+    Frames are downscaled to a small grayscale thumbnail and compared against
+    the thumbnail of the last frame that went through the model. If too few
+    pixels changed, the previous count is still valid and YOLO does not need
+    to run. A full pass is still forced every max_idle_seconds so slow drifts
+    (lighting, someone sitting perfectly still after entering) are caught.
+    """
+
+    def __init__(self, thumbnail_width=64, pixel_threshold=25,
+                 min_changed_fraction=0.01, max_idle_seconds=60.0):
+        """
+        Initialize the motion gate.
+
+        Args:
+            thumbnail_width: Width in pixels of the comparison thumbnail
+            pixel_threshold: Grayscale difference (0-255) for a pixel to count as changed
+            min_changed_fraction: Fraction of changed pixels that counts as motion
+            max_idle_seconds: Force an inference after this long without one (None = never)
+        """
+        self.thumbnail_width = thumbnail_width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_fraction = min_changed_fraction
+        self.max_idle_seconds = max_idle_seconds
+
+        self.reference = None
+        self.reference_time = None
+        self.frames_checked = 0
+        self.frames_skipped = 0
+        self.last_changed_fraction = 0.0
+        self._candidate = None  # (thumbnail, time) of the last frame that showed motion
+
+    def _thumbnail(self, frame):
+        """Downscale and blur a BGR frame to a small grayscale thumbnail."""
+        h, w = frame.shape[:2]
+        height = max(1, int(h * self.thumbnail_width / w))
+        small = cv2.resize(frame, (self.thumbnail_width, height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def has_motion(self, frame, now=None, update_reference=True):
+        """
+        Decide whether the frame differs enough from the last inferred frame.
+
+        When motion is detected the frame becomes the new reference, on the
+        assumption that the caller runs inference on it. Callers that may
+        still drop the frame pass update_reference=False and call commit()
+        once it is actually inferred.
+
+        Args:
+            frame: BGR frame
+            now: Current time in seconds (defaults to time.time())
+            update_reference: Adopt the frame as reference right away when it shows motion
+
+        Returns:
+            bool: True if inference should run on this frame
+        """
+        now = time.time() if now is None else now
+        self.frames_checked += 1
+        thumbnail = self._thumbnail(frame)
+
+        if self.reference is None or self.reference.shape != thumbnail.shape:
+            motion = True
+        elif self.max_idle_seconds is not None and now - self.reference_time >= self.max_idle_seconds:
+            motion = True
+        else:
+            diff = cv2.absdiff(thumbnail, self.reference)
+            self.last_changed_fraction = float(np.count_nonzero(diff > self.pixel_threshold)) / diff.size
+            motion = self.last_changed_fraction >= self.min_changed_fraction
+
+        if motion:
+            self._candidate = (thumbnail, now)
+            if update_reference:
+                self.commit()
+        else:
+            self._candidate = None
+            self.frames_skipped += 1
+        return motion
+
+    def commit(self):
+        """Make the last frame that showed motion the reference, once it was inferred."""
+        if self._candidate is not None:
+            self.reference, self.reference_time = self._candidate
+            self._candidate = None
+
+    def reset(self):
+        """Drop the reference frame, e.g. after switching cameras."""
+        self.reference = None
+        self.reference_time = None
+        self._candidate = None
+
+    def get_stats(self):
+        """Get the number of frames checked and skipped."""
+        skipped_ratio = self.frames_skipped / self.frames_checked if self.frames_checked else 0.0
+        return {
+            'frames_checked': self.frames_checked,
+            'frames_skipped': self.frames_skipped,
+            'skipped_ratio': skipped_ratio,
+            'last_changed_fraction': self.last_changed_fraction,
+        }
@@ -0,0 +1,318 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from vision.frame_pool import FrameHandle, FramePool, as_array, release_frame
+
+
+def _inference_worker(model_path, confidence_threshold, slot_names, task_queue, result_queue):
+    """
+    Worker process main loop.
+
+    Attaches to every shared-memory frame slot once, loads its own
+    PeopleCounter and then runs detection on whatever slot the parent points
+    it at. Only the small detection dict travels back over the result queue.
+    """
+    from vision.yolo_people_counter import PeopleCounter
+    from vision.room_config import RoomRegion
+
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    # Buffers in a FramePool are used from offset 0, so a flat view reshaped
+    # to the task's frame shape is exactly the frame the parent wrote
+    try:
+        counter = PeopleCounter(model_path=model_path, confidence_threshold=confidence_threshold)
+    except Exception as e:
+        # The parent notices the exit and stops waiting for this worker
+        print(f"Inference worker could not load its model: {e}")
+        for slot in slots:
+            slot.close()
+        raise
+    regions = {}  # ROI polygons (as nested tuples) -> RoomRegion, so geometry is rasterized once
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+
+            job_id, slot_index, shape, dtype, roi, imgsz, tiles = task
+            frame = np.ndarray(shape, dtype=dtype, buffer=slots[slot_index].buf)
+            region = regions.get(roi) if roi else None
+            if roi and region is None:
+                region = regions[roi] = RoomRegion([list(polygon) for polygon in roi])
+            try:
+                detections = counter.detect(frame, region=region, imgsz=imgsz, tiles=tiles)
+            except Exception as e:
+                print(f"Error in inference worker: {e}")
+                detections = None
+            del frame
+            result_queue.put((job_id, detections))
+    finally:
+        for slot in slots:
+            slot.close()
+
+
+class ProcessInferencePool:
+    """
+    Runs PeopleCounter in a pool of worker processes to escape the GIL.
+
+    Frame buffers live in a shared-memory FramePool. Capture code that decodes
+    straight into frame_pool hands frames over without any copy; other frames
+    are copied once into a free buffer. Workers read the buffers in place and
+    send back only counts and boxes. The pool has the same register_source /
+    submit_frame interface as InferenceEngine, so a CameraThread can use
+    either one.
+
+    A worker that crashes (or fails to load its model) takes its current job
+    with it. Jobs without a result after job_timeout seconds are given up, so
+    their source can submit again; once no worker is left, every frame is
+    refused.
+    """
+
+    def __init__(self, num_workers=2, model_path=None, confidence_threshold=0.5,
+                 max_frame_shape=(1080, 1920, 3), slots_per_worker=4, job_timeout=30.0):
+        """
+        Initialize the process pool.
+
+        Args:
+            num_workers: Number of worker processes (each loads its own model)
+            model_path: Path to YOLO model file (default: from vision/config.json)
+            confidence_threshold: Minimum confidence for person detection
+            max_frame_shape: Largest frame (h, w, c) a shared-memory buffer can hold
+            slots_per_worker: Number of shared buffers per worker; capture sources
+                              decoding into frame_pool draw from the same buffers
+            job_timeout: Seconds to wait for a job's result before giving it up
+                         (covers the workers' model loading on start)
+        """
+        self.num_workers = num_workers
+        self.model_path = model_path
+        self.confidence_threshold = confidence_threshold
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.num_slots = max(1, num_workers * slots_per_worker)
+        self.job_timeout = job_timeout
+        self.running = False
+
+        self._context = mp.get_context('spawn')  # fork is unsafe with torch and Qt
+        self.frame_pool = None
+        self._workers = []
+        self._task_queue = None
+        self._result_queue = None
+        self._result_thread = None
+
+        self._lock = threading.Lock()
+        self._in_flight = {}     # job id -> (source_id, frame, pool handle, submit time)
+        self._busy_sources = set()
+        self._callbacks = {}
+        self._next_job_id = 0
+        self._dead_workers = set()  # pids already reported as exited
+        self._last_health_check = 0.0
+
+        self.frames_submitted = 0
+        self.frames_dropped = 0
+        self.frames_completed = 0
+        self.jobs_abandoned = 0
+        self.fps = 0
+        self._fps_start_time = time.time()
+
+    def start(self):
+        """Allocate shared memory and start the worker processes."""
+        if self.running:
+            return
+        self.running = True
+
+        self.frame_pool = FramePool(num_buffers=self.num_slots, buffer_bytes=self.slot_bytes, shared=True)
+        self._task_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+
+        slot_names = self.frame_pool.shared_names
+        for _ in range(self.num_workers):
+            worker = self._context.Process(
+                target=_inference_worker,
+                args=(self.model_path, self.confidence_threshold, slot_names,
+                      self._task_queue, self._result_queue),
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+        self._result_thread = threading.Thread(target=self._collect_results, daemon=True)
+        self._result_thread.start()
+        print(f"Started {self.num_workers} inference worker processes")
+
+    def stop(self):
+        """Stop the workers and free the shared memory."""
+        if not self.running:
+            return
+        self.running = False
+
+        for _ in self._workers:
+            self._task_queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+        if self._result_thread:
+            self._result_thread.join(timeout=2.0)
+            self._result_thread = None
+
+        for job_id in list(self._in_flight):
+            self._abandon_job(job_id)
+        self.frame_pool.close()
+
+    def register_source(self, source_id, callback):
+        """
+        Register a capture source.
+
+        Args:
+            source_id: Unique identifier for the source
+            callback: Called as callback(frame, detections) from the result thread
+        """
+        with self._lock:
+            self._callbacks[source_id] = callback
+
+    def unregister_source(self, source_id):
+        """Remove a capture source."""
+        with self._lock:
+            self._callbacks.pop(source_id, None)
+
+    def submit_frame(self, source_id, frame, region=None, imgsz=None, tiles=None):
+        """
+        Send a frame to the workers.
+
+        A source only ever has one frame in flight; frames arriving while it
+        is busy, or while every buffer is taken, are refused so the pool always
+        works on recent frames. An accepted frame is owned by the pool until
+        it is passed to the source's callback.
+
+        Args:
+            source_id: Registered source identifier
+            frame: ndarray or FrameHandle; handles from frame_pool are sent
+                   to the workers without copying
+            region: Optional RoomRegion to restrict detection to
+            imgsz: Optional inference image size for this frame
+            tiles: Optional (rows, cols, overlap) for sliced inference of this frame
+
+        Returns:
+            bool: True if the frame was queued
+        """
+        if not self.running or not self.workers_alive():
+            return False
+
+        with self._lock:
+            if source_id not in self._callbacks or source_id in self._busy_sources:
+                self.frames_dropped += 1
+                return False
+            self._busy_sources.add(source_id)
+
+        if isinstance(frame, FrameHandle) and frame.pool is self.frame_pool:
+            handle = frame
+        else:
+            array = as_array(frame)
+            handle = self.frame_pool.acquire(array.shape, array.dtype)
+            if handle is None:
+                with self._lock:
+                    self._busy_sources.discard(source_id)
+                    self.frames_dropped += 1
+                return False
+            handle.array[...] = array
+
+        with self._lock:
+            job_id = self._next_job_id
+            self._next_job_id += 1
+            self._in_flight[job_id] = (source_id, frame, handle, time.time())
+            self.frames_submitted += 1
+        roi = None
+        if region is not None:
+            roi = tuple(tuple(map(tuple, polygon.tolist())) for polygon in region.polygons)
+        self._task_queue.put((job_id, handle.index, handle.array.shape, handle.array.dtype.str, roi, imgsz, tiles))
+        return True
+
+    def workers_alive(self):
+        """Number of worker processes still running."""
+        return sum(worker.is_alive() for worker in self._workers)
+
+    def _abandon_job(self, job_id):
+        """Give up on a job: free its buffer and let its source submit again."""
+        with self._lock:
+            job = self._in_flight.pop(job_id, None)
+            if job is None:
+                return
+            source_id, frame, handle, _ = job
+            self._busy_sources.discard(source_id)
+            self.jobs_abandoned += 1
+        if handle is not frame:
+            handle.release()
+        release_frame(frame)
+
+    def _check_workers(self):
+        """Report workers that died and give up on jobs that will never finish."""
+        now = time.time()
+        if now - self._last_health_check < 1.0:
+            return
+        self._last_health_check = now
+
+        for worker in self._workers:
+            if not worker.is_alive() and worker.pid not in self._dead_workers:
+                self._dead_workers.add(worker.pid)
+                print(f"Inference worker {worker.pid} exited with code {worker.exitcode}")
+
+        no_workers = self.workers_alive() == 0
+        with self._lock:
+            expired = [job_id for job_id, (_, _, _, submitted) in self._in_flight.items()
+                       if no_workers or now - submitted > self.job_timeout]
+        for job_id in expired:
+            self._abandon_job(job_id)
+        if expired:
+            print(f"Gave up on {len(expired)} inference jobs without a result")
+
+    def _collect_results(self):
+        """Receive detections from the workers and dispatch them to the sources."""
+        while self.running or self._in_flight:
+            if self.running:
+                self._check_workers()
+            try:
+                job_id, detections = self._result_queue.get(timeout=0.2)
+            except queue.Empty:
+                if not self.running:
+                    break
+                continue
+
+            with self._lock:
+                job = self._in_flight.pop(job_id, None)
+                if job is None:
+                    # Result of a job that was already given up
+                    continue
+                source_id, frame, handle, _ = job
+                self._busy_sources.discard(source_id)
+                callback = self._callbacks.get(source_id)
+                self.frames_completed += 1
+
+            if self.frames_completed % 30 == 0:  # Update FPS every 30 frames
+                current_time = time.time()
+                self.fps = 30 / (current_time - self._fps_start_time)
+                self._fps_start_time = current_time
+
+            if handle is not frame:
+                handle.release()  # the copy made in submit_frame
+            if callback is not None and detections is not None:
+                callback(frame, detections)
+            else:
+                release_frame(frame)
+
+    def get_stats(self):
+        """Get submission, drop and completion counters."""
+        with self._lock:
+            return {
+                'workers': len(self._workers),
+                'workers_alive': self.workers_alive(),
+                'jobs_abandoned': self.jobs_abandoned,
+                'frames_submitted': self.frames_submitted,
+                'frames_dropped': self.frames_dropped,
+                'frames_completed': self.frames_completed,
+                'frames_in_flight': len(self._in_flight),
+                'frame_pool': self.frame_pool.get_stats() if self.frame_pool else None,
+            }
@@ -0,0 +1,136 @@
+"""
+INT8 post-training quantization of the people counter model.
+
+Quantization is calibrated on our own recorded classroom footage rather than
+a generic dataset, so activation ranges match the scenes the model actually
+sees. Two steps:
+
+    # 1. Sample calibration frames from recorded classroom video
+    python -m vision.quantize calibrate recordings/*.mp4
+
+    # 2. Export best.pt to an INT8 OpenVINO model using those frames
+    python -m vision.quantize export
+
+Then set "backend": "openvino-int8" in vision/config.json. Check the
+accuracy cost first with testing/quantization_report.py.
+"""
+import argparse
+import glob
+import os
+import cv2
+from vision.backends import export_model
+
+CALIBRATION_DIR = "calibration"
+
+
+def build_calibration_set(sources, output_dir=CALIBRATION_DIR, every_n_seconds=2.0, max_frames=300):
+    """
+    Sample frames from recorded classroom videos (or copy still images) into
+    a calibration dataset that ultralytics can read.
+
+    Args:
+        sources: Video files, image files or directories of images
+        output_dir: Dataset directory to create
+        every_n_seconds: Sampling interval within each video
+        max_frames: Maximum number of calibration frames in total
+
+    Returns:
+        str: Path of the dataset yaml to pass to quantize_model()
+    """
+    images_dir = os.path.join(output_dir, "images")
+    os.makedirs(images_dir, exist_ok=True)
+    saved = 0
+
+    for source in sources:
+        if saved >= max_frames:
+            break
+
+        if os.path.isdir(source):
+            paths = sorted(glob.glob(os.path.join(source, '*.jpg')) + glob.glob(os.path.join(source, '*.png')))
+            for path in paths:
+                if saved >= max_frames:
+                    break
+                frame = cv2.imread(path)
+                if frame is not None:
+                    cv2.imwrite(os.path.join(images_dir, f"calib_{saved:05d}.jpg"), frame)
+                    saved += 1
+            continue
+
+        frame = cv2.imread(source)
+        if frame is not None:
+            cv2.imwrite(os.path.join(images_dir, f"calib_{saved:05d}.jpg"), frame)
+            saved += 1
+            continue
+
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            print(f"Could not open calibration source '{source}'")
+            continue
+        video_fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        step = max(1, int(round(video_fps * every_n_seconds)))
+        index = 0
+        while saved < max_frames:
+            if not cap.grab():
+                break
+            if index % step == 0:
+                ret, frame = cap.retrieve()
+                if ret:
+                    cv2.imwrite(os.path.join(images_dir, f"calib_{saved:05d}.jpg"), frame)
+                    saved += 1
+            index += 1
+        cap.release()
+
+    yaml_path = os.path.join(output_dir, "calibration.yaml")
+    with open(yaml_path, 'w') as f:
+        f.write(f"path: {os.path.abspath(output_dir)}\n")
+        f.write("train: images\n")
+        f.write("val: images\n")
+        f.write("names:\n  0: person\n")
+
+    print(f"Saved {saved} calibration frames to {images_dir}")
+    return yaml_path
+
+
+def quantize_model(model_path='best.pt', data=os.path.join(CALIBRATION_DIR, "calibration.yaml"),
+                   imgsz=640, fraction=1.0):
+    """
+    Export an INT8 OpenVINO model calibrated on a calibration dataset.
+
+    Args:
+        model_path: Path to the FP32 .pt weights
+        data: Calibration dataset yaml from build_calibration_set()
+        imgsz: Inference image size baked into the export
+        fraction: Fraction of the calibration frames to use
+
+    Returns:
+        str: Path of the INT8 model directory
+    """
+    if not os.path.exists(data):
+        raise FileNotFoundError(f"Calibration dataset '{data}' not found, run 'calibrate' first")
+    return export_model(model_path, 'openvino-int8', imgsz=imgsz, data=data, fraction=fraction)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="INT8 quantization of the people counter model")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    calibrate = subparsers.add_parser('calibrate', help="Sample calibration frames from classroom recordings")
+    calibrate.add_argument('sources', nargs='+', help="Video files, images or image directories")
+    calibrate.add_argument('--output', default=CALIBRATION_DIR)
+    calibrate.add_argument('--every-n-seconds', type=float, default=2.0)
+    calibrate.add_argument('--max-frames', type=int, default=300)
+
+    export = subparsers.add_parser('export', help="Export an INT8 OpenVINO model")
+    export.add_argument('--model', default='best.pt')
+    export.add_argument('--data', default=os.path.join(CALIBRATION_DIR, "calibration.yaml"))
+    export.add_argument('--imgsz', type=int, default=640)
+
+    args = parser.parse_args()
+    if args.command == 'calibrate':
+        build_calibration_set(args.sources, args.output, args.every_n_seconds, args.max_frames)
+    else:
+        quantize_model(args.model, args.data, args.imgsz)
+
+
+if __name__ == "__main__":
+    main()
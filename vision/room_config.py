@@ -0,0 +1,136 @@
+import cv2
+import numpy as np
+from vision.backends import load_vision_config
+
+DEFAULT_ROOM_SETTINGS = {
+    'camera': None,              # camera index, stream URL or video file shown on the video wall
+    'imgsz': None,               # None = global imgsz from vision/config.json
+    'capture_size': [640, 480],  # width, height requested from the camera
+    'roi': [],                   # polygons of normalized [x, y] points; empty = whole frame
+    'tiles': None,               # [rows, cols] for sliced inference in large halls
+    'tile_overlap': 0.2,         # fraction of overlap between neighbouring tiles
+}
+
+
+def get_room_settings(room_id, config=None):
+    """
+    Get the vision settings for one room.
+
+    Rooms are configured in the "rooms" section of vision/config.json, keyed
+    by room_id, e.g.:
+
+        "rooms": {
+            "12": {"imgsz": 480, "roi": [[[0.1, 0.3], [0.9, 0.3], [0.95, 1.0], [0.05, 1.0]]]}
+        }
+
+    ROI polygon points are fractions of the frame width and height, so the
+    same config works at any capture resolution.
+
+    Args:
+        room_id: Room id from the database (None for defaults)
+        config: Already loaded vision config (loaded from disk if omitted)
+
+    Returns:
+        dict with 'camera', 'imgsz', 'capture_size', 'roi', 'tiles' and 'tile_overlap'
+    """
+    config = config if config is not None else load_vision_config()
+    settings = dict(DEFAULT_ROOM_SETTINGS)
+    if room_id is not None:
+        settings.update(config.get('rooms', {}).get(str(room_id), {}))
+    return settings
+
+
+def tile_grid(room_settings):
+    """
+    Sliced-inference grid of a room.
+
+    Returns:
+        tuple: (rows, cols, overlap), or None if the room is not tiled
+    """
+    if not room_settings.get('tiles'):
+        return None
+    rows, cols = room_settings['tiles']
+    return int(rows), int(cols), float(room_settings.get('tile_overlap', 0.2))
+
+
+class RoomRegion:
+    """
+    Region of interest made of one or more polygons.
+
+    Only the bounding rectangle of the polygons is sent to the model, with
+    pixels outside the polygons blacked out, so the model works on fewer
+    pixels and never sees hallways through doors. Detections are shifted
+    back into full-frame coordinates and kept only if their center lies
+    inside a polygon.
+    """
+
+    def __init__(self, polygons):
+        """
+        Args:
+            polygons: List of polygons, each a list of normalized [x, y] points
+        """
+        self.polygons = [np.asarray(polygon, dtype=np.float32) for polygon in polygons if len(polygon) >= 3]
+        self._cached_shape = None
+        self._mask = None
+        self._rect = None
+
+    @classmethod
+    def from_settings(cls, room_settings):
+        """Build a region from get_room_settings() output, or None if the room has no ROI."""
+        polygons = room_settings.get('roi') or []
+        region = cls(polygons)
+        return region if region.polygons else None
+
+    def _prepare_geometry(self, frame_shape):
+        """Rasterize the polygons for a frame size (cached per size)."""
+        if self._cached_shape == frame_shape[:2]:
+            return
+        h, w = frame_shape[:2]
+        points = [np.round(polygon * [w, h]).astype(np.int32) for polygon in self.polygons]
+
+        mask = np.zeros((h, w), dtype=np.uint8)
+        cv2.fillPoly(mask, points, 255)
+
+        all_points = np.concatenate(points)
+        x0, y0 = np.clip(all_points.min(axis=0), 0, [w - 1, h - 1])
+        x1, y1 = np.clip(all_points.max(axis=0) + 1, 1, [w, h])
+
+        self._cached_shape = frame_shape[:2]
+        self._mask = mask
+        self._rect = (int(x0), int(y0), int(x1), int(y1))
+
+    def crop(self, frame):
+        """
+        Cut the region out of a frame for inference.
+
+        Returns:
+            tuple: (masked crop, (x offset, y offset))
+        """
+        self._prepare_geometry(frame.shape)
+        x0, y0, x1, y1 = self._rect
+        crop = frame[y0:y1, x0:x1]
+        # bitwise_and writes a new (small) array, the caller's frame is untouched
+        masked = cv2.bitwise_and(crop, crop, mask=self._mask[y0:y1, x0:x1])
+        return masked, (x0, y0)
+
+    def restore(self, detections, offset):
+        """
+        Shift detections from crop to frame coordinates and drop those outside the polygons.
+
+        Args:
+            detections: Detection dict from PeopleCounter.extract_persons on the crop
+            offset: (x, y) offset returned by crop()
+
+        Returns:
+            Detection dict in frame coordinates
+        """
+        boxes = detections['boxes'] + np.array([offset[0], offset[1], offset[0], offset[1]])
+        h, w = self._mask.shape
+        centers_x = np.clip((boxes[:, 0] + boxes[:, 2]) // 2, 0, w - 1)
+        centers_y = np.clip((boxes[:, 1] + boxes[:, 3]) // 2, 0, h - 1)
+        inside = self._mask[centers_y, centers_x] > 0
+        return {
+            'count': int(inside.sum()),
+            'boxes': boxes[inside],
+            'confidences': detections['confidences'][inside],
+        }
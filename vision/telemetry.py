@@ -0,0 +1,233 @@
+"""
+Per-frame pipeline telemetry.
+
+Every stage a frame passes through records how long it took, per camera:
+
+    capture      cap.read() in the decoder thread
+    preprocess   ROI crop plus the model's letterbox/normalize step
+    inference    model forward pass
+    postprocess  NMS, person filtering and ROI restore
+    annotation   drawing boxes for display
+    emit         handing the frame to the display
+    render       scaling and color conversion in the render thread
+    paint        pixmap update in the GUI thread
+    latency      end to end, from capture until the frame is painted
+
+The last `window` samples of each stage are kept, so percentiles describe
+recent behaviour. Summaries are shown on the camera page and can be
+exported to a JSON file or served over HTTP (Prometheus text format on
+/metrics, JSON on /metrics.json) as configured under "telemetry" in
+vision/config.json.
+"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+
+STAGES = ('capture', 'preprocess', 'inference', 'postprocess', 'annotation', 'emit', 'render', 'paint',
+          'latency')
+
+DEFAULT_TELEMETRY_SETTINGS = {
+    'window': 300,          # samples kept per camera and stage
+    'http_port': None,      # e.g. 9108 to serve http://127.0.0.1:9108/metrics
+    'export_file': None,    # e.g. "telemetry.json", rewritten every export_interval seconds
+    'export_interval': 10.0,
+}
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+class PipelineTelemetry:
+    """Rolling per-camera, per-stage timings."""
+
+    def __init__(self, window=300):
+        """
+        Args:
+            window: Number of recent samples kept per camera and stage
+        """
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}  # source -> stage -> deque of seconds
+        self._totals = {}   # source -> stage -> number of samples ever recorded
+
+    def record(self, source, stage, seconds):
+        """Record one duration (in seconds) for a camera's stage."""
+        if seconds is None:
+            return
+        source = str(source)
+        with self._lock:
+            stages = self._samples.setdefault(source, {})
+            if stage not in stages:
+                stages[stage] = deque(maxlen=self.window)
+            stages[stage].append(seconds)
+            totals = self._totals.setdefault(source, {})
+            totals[stage] = totals.get(stage, 0) + 1
+
+    def record_many(self, source, timings):
+        """Record a dict of stage -> seconds, e.g. PeopleCounter.last_timings."""
+        for stage, seconds in (timings or {}).items():
+            self.record(source, stage, seconds)
+
+    def sources(self):
+        with self._lock:
+            return list(self._samples)
+
+    def summary(self, source=None):
+        """
+        Percentiles of the recent samples.
+
+        Args:
+            source: Camera to summarize (None = all cameras)
+
+        Returns:
+            dict source -> stage -> {'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}
+        """
+        with self._lock:
+            selected = [str(source)] if source is not None else list(self._samples)
+            copies = {name: {stage: np.array(samples) for stage, samples in self._samples.get(name, {}).items()}
+                      for name in selected}
+            totals = {name: dict(self._totals.get(name, {})) for name in selected}
+
+        result = {}
+        for name, stages in copies.items():
+            result[name] = {}
+            for stage in sorted(stages, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+                samples = stages[stage] * 1000.0
+                if len(samples) == 0:
+                    continue
+                p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+                result[name][stage] = {
+                    'count': totals[name].get(stage, 0),
+                    'mean_ms': float(samples.mean()),
+                    'p50_ms': float(p50),
+                    'p95_ms': float(p95),
+                    'p99_ms': float(p99),
+                    'max_ms': float(samples.max()),
+                }
+        return result
+
+    def format_summary(self, source):
+        """Multi-line 'stage  p50 / p95 ms' text for display."""
+        stages = self.summary(source).get(str(source), {})
+        if not stages:
+            return "No samples yet"
+        return "\n".join(f"{stage:<12}{values['p50_ms']:>7.1f} /{values['p95_ms']:>7.1f}"
+                         for stage, values in stages.items())
+
+    def to_prometheus(self):
+        """Summaries in Prometheus text exposition format."""
+        lines = [
+            "# HELP eduvision_stage_seconds Recent per-stage frame processing time",
+            "# TYPE eduvision_stage_seconds summary",
+        ]
+        for source, stages in self.summary().items():
+            for stage, values in stages.items():
+                labels = f'camera="{source}",stage="{stage}"'
+                for quantile, key in (('0.5', 'p50_ms'), ('0.95', 'p95_ms'), ('0.99', 'p99_ms')):
+                    lines.append(f'eduvision_stage_seconds{{{labels},quantile="{quantile}"}} {values[key] / 1000.0:.6f}')
+                lines.append(f'eduvision_stage_seconds_count{{{labels}}} {values["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def export_json(self, path):
+        """Write the current summary to a JSON file."""
+        data = {'created': time.time(), 'window': self.window, 'cameras': self.summary()}
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def reset(self, source=None):
+        """Drop samples of one camera (or all)."""
+        with self._lock:
+            if source is None:
+                self._samples.clear()
+                self._totals.clear()
+            else:
+                self._samples.pop(str(source), None)
+                self._totals.pop(str(source), None)
+
+
+def get_telemetry(window=None):
+    """
+    Get the process-wide telemetry collector, creating it on first use.
+
+    Args:
+        window: Samples kept per stage (only used when the collector is created)
+    """
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = PipelineTelemetry(window or DEFAULT_TELEMETRY_SETTINGS['window'])
+        return _telemetry
+
+
+def start_metrics_server(port, telemetry=None, host='127.0.0.1'):
+    """
+    Serve telemetry over HTTP from a daemon thread.
+
+    Returns:
+        ThreadingHTTPServer (call shutdown() to stop)
+    """
+    telemetry = telemetry or get_telemetry()
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith('/metrics.json'):
+                body = json.dumps(telemetry.summary()).encode()
+                content_type = 'application/json'
+            elif self.path.startswith('/metrics'):
+                body = telemetry.to_prometheus().encode()
+                content_type = 'text/plain; version=0.0.4'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # scrapes every few seconds would flood the console
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Telemetry available at http://{host}:{port}/metrics")
+    return server
+
+
+def start_file_export(path, interval=10.0, telemetry=None):
+    """Rewrite the telemetry summary to a JSON file every `interval` seconds."""
+    telemetry = telemetry or get_telemetry()
+
+    def _export_loop():
+        while True:
+            time.sleep(interval)
+            try:
+                telemetry.export_json(path)
+            except OSError as e:
+                print(f"Error exporting telemetry: {e}")
+
+    thread = threading.Thread(target=_export_loop, daemon=True)
+    thread.start()
+    return thread
+
+
+def start_telemetry_exports(settings=None):
+    """
+    Create the collector and start the exports enabled in the settings.
+
+    Args:
+        settings: The "telemetry" section of vision/config.json
+    """
+    settings = {**DEFAULT_TELEMETRY_SETTINGS, **(settings or {})}
+    telemetry = get_telemetry(settings['window'])
+    if settings['http_port']:
+        try:
+            start_metrics_server(int(settings['http_port']), telemetry)
+        except OSError as e:
+            print(f"Could not start telemetry server on port {settings['http_port']}: {e}")
+    if settings['export_file']:
+        start_file_export(settings['export_file'], settings['export_interval'], telemetry)
+    return telemetry
@@ -0,0 +1,193 @@
+import time
+from collections import deque
+import numpy as np
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Pairwise intersection-over-union of two sets of xyxy boxes.
+
+    Returns:
+        np.ndarray of shape (len(boxes_a), len(boxes_b))
+    """
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)))
+    a = np.asarray(boxes_a, dtype=float)[:, None, :]
+    b = np.asarray(boxes_b, dtype=float)[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    intersection = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+
+class Track:
+    """One tracked person with a constant-velocity motion model."""
+
+    def __init__(self, track_id, box, confidence):
+        self.track_id = track_id
+        self.box = np.asarray(box, dtype=float)
+        self.last_measured_box = self.box
+        self.frames_since_match = 0
+        self.velocity = np.zeros(4)
+        self.confidence = confidence
+        self.hits = 1
+        self.misses = 0
+        self.last_matched_at = time.time()
+
+    def predict(self, damping=0.95):
+        """Advance the box by one frame of motion, slowing down while unmatched."""
+        self.box = self.box + self.velocity
+        self.velocity = self.velocity * damping
+        self.frames_since_match += 1
+
+    def correct(self, box, confidence, smoothing=0.5):
+        """Snap to a matched detection and update the velocity estimate."""
+        box = np.asarray(box, dtype=float)
+        frames = max(1, self.frames_since_match)
+        observed_velocity = (box - self.last_measured_box) / frames
+        self.velocity = smoothing * observed_velocity + (1 - smoothing) * self.velocity
+        self.box = box
+        self.last_measured_box = box
+        self.frames_since_match = 0
+        self.confidence = confidence
+        self.hits += 1
+        self.misses = 0
+        self.last_matched_at = time.time()
+
+
+class PersonTracker:
+    """
+    IoU-based multi-person tracker (SORT-style, greedy matching).
+
+    Keeps person IDs across frames so the count doesn't flicker when a
+    detection is missed for a frame or two. Between full detection passes,
+    predict() moves every box along its estimated velocity, so detection can
+    run only every K frames while the display still follows people. The
+    smoothed count is the median of the counts of recent detection passes.
+
+    A track that a detection pass failed to match is also dropped once it has
+    gone unmatched for max_unmatched_seconds, even when no further passes run
+    (e.g. the motion gate holds inference on a static scene after someone left).
+    """
+
+    def __init__(self, iou_threshold=0.3, max_misses=10, min_hits=2, smoothing_window=15,
+                 max_unmatched_seconds=5.0):
+        """
+        Initialize the tracker.
+
+        Args:
+            iou_threshold: Minimum IoU between a predicted track and a detection to match
+            max_misses: Detection passes a track survives without a matching detection
+            min_hits: Matches needed before a track is counted
+            smoothing_window: Number of recent detection passes the smoothed count is taken over
+            max_unmatched_seconds: Seconds a missed track survives without a match
+        """
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+        self.min_hits = min_hits
+        self.max_unmatched_seconds = max_unmatched_seconds
+        self.tracks = []
+        self.next_id = 1
+        self.updates = 0
+        self._recent_counts = deque(maxlen=smoothing_window)
+
+    def _confirmed(self):
+        # Right after start-up nothing could have min_hits yet, count everything
+        if self.updates < self.min_hits:
+            return list(self.tracks)
+        return [track for track in self.tracks if track.hits >= self.min_hits]
+
+    def _expire(self):
+        """Drop tracks that missed too many passes or stayed unmatched too long; returns how many."""
+        now = time.time()
+        before = len(self.tracks)
+        self.tracks = [track for track in self.tracks
+                       if track.misses <= self.max_misses
+                       and not (track.misses and now - track.last_matched_at > self.max_unmatched_seconds)]
+        return before - len(self.tracks)
+
+    def _output(self):
+        confirmed = self._confirmed()
+        return {
+            'count': len(confirmed),
+            'boxes': np.array([track.box for track in confirmed]).reshape(-1, 4).round().astype(int),
+            'confidences': np.array([track.confidence for track in confirmed], dtype=float),
+            'track_ids': [track.track_id for track in confirmed],
+        }
+
+    def update(self, detections):
+        """
+        Advance the tracks by one frame and match them to fresh detections.
+
+        Args:
+            detections: Detection dict from PeopleCounter.detect()
+
+        Returns:
+            Detection dict of confirmed tracks, with an extra 'track_ids' list
+        """
+        self.updates += 1
+        for track in self.tracks:
+            track.predict()
+
+        boxes = detections['boxes']
+        confidences = detections['confidences']
+        ious = iou_matrix([track.box for track in self.tracks], boxes)
+
+        matched_tracks = set()
+        matched_detections = set()
+        # Greedy matching: best remaining IoU pair first
+        for flat_index in np.argsort(-ious, axis=None):
+            track_index, detection_index = np.unravel_index(flat_index, ious.shape)
+            if ious[track_index, detection_index] < self.iou_threshold:
+                break
+            if track_index in matched_tracks or detection_index in matched_detections:
+                continue
+            self.tracks[track_index].correct(boxes[detection_index], float(confidences[detection_index]))
+            matched_tracks.add(track_index)
+            matched_detections.add(detection_index)
+
+        for track_index, track in enumerate(self.tracks):
+            if track_index not in matched_tracks:
+                track.misses += 1
+
+        for detection_index in range(len(boxes)):
+            if detection_index not in matched_detections:
+                self.tracks.append(Track(self.next_id, boxes[detection_index], float(confidences[detection_index])))
+                self.next_id += 1
+
+        self._expire()
+        output = self._output()
+        self._recent_counts.append(output['count'])
+        return output
+
+    def predict(self):
+        """
+        Propagate every track one frame without a detection pass.
+
+        Returns:
+            Detection dict of confirmed tracks at their predicted positions
+        """
+        for track in self.tracks:
+            track.predict()
+        expired = self._expire()
+        output = self._output()
+        if expired:
+            # Expiry stands in for the detection pass that would have dropped them
+            self._recent_counts.append(output['count'])
+        return output
+
+    @property
+    def smoothed_count(self):
+        """Median of the counts of the recent detection passes."""
+        if not self._recent_counts:
+            return 0
+        return int(np.median(self._recent_counts))
+
+    def reset(self):
+        """Drop all tracks, e.g. after switching cameras."""
+        self.tracks = []
+        self.updates = 0
+        self._recent_counts.clear()
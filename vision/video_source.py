@@ -0,0 +1,204 @@
+import os
+import time
+import cv2
+from vision.frame_grabber import FrameGrabber
+from vision.iphone import configure_capture
+
+STREAM_PREFIXES = ('rtsp://', 'rtsps://', 'http://', 'https://')
+
+
+def parse_source(source):
+    """
+    Normalize a source spec into (kind, value).
+
+    Args:
+        source: Camera index (int or digit string), RTSP/HTTP URL or video file path
+
+    Returns:
+        tuple: ('device', int), ('stream', url) or ('file', path)
+    """
+    if isinstance(source, int):
+        return 'device', source
+    text = str(source).strip()
+    if text.isdigit():
+        return 'device', int(text)
+    if text.lower().startswith(STREAM_PREFIXES):
+        return 'stream', text
+    return 'file', text
+
+
+def open_capture(kind, value, width=640, height=480, open_timeout_ms=5000, read_timeout_ms=5000):
+    """
+    Open a cv2.VideoCapture for any kind of source.
+
+    Streams and files go through FFmpeg with hardware decoding requested
+    when the OpenCV build supports it (falls back to software otherwise).
+    RTSP is forced to TCP so frames don't tear on lossy networks.
+
+    Returns:
+        cv2.VideoCapture (check isOpened())
+    """
+    if kind == 'device':
+        cap = cv2.VideoCapture(value)
+        if cap.isOpened():
+            configure_capture(cap, width, height)
+        return cap
+
+    if kind == 'stream' and value.lower().startswith(('rtsp://', 'rtsps://')):
+        os.environ.setdefault('OPENCV_FFMPEG_CAPTURE_OPTIONS', 'rtsp_transport;tcp')
+
+    params = []
+    if hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+        params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+    if kind == 'stream' and hasattr(cv2, 'CAP_PROP_OPEN_TIMEOUT_MSEC'):
+        params += [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, open_timeout_ms,
+                   cv2.CAP_PROP_READ_TIMEOUT_MSEC, read_timeout_ms]
+    if params:
+        cap = cv2.VideoCapture(value, cv2.CAP_FFMPEG, params)
+        if cap.isOpened():
+            return cap
+        cap.release()
+    return cv2.VideoCapture(value)
+
+
+class VideoSource:
+    """
+    One video input - local camera, IP camera stream or recorded file.
+
+    Decoding runs in a FrameGrabber thread, so read() always returns the
+    newest frame. A stream that drops is reopened with exponential backoff
+    instead of ending the pipeline; a file can loop or end, and a local
+    camera fails right away so the caller can switch to another one.
+    """
+
+    def __init__(self, source, width=640, height=480, frame_pool=None, reconnect=None, loop=False,
+                 realtime=True, initial_backoff=1.0, max_backoff=30.0):
+        """
+        Initialize the source (nothing is opened until open() or read()).
+
+        Args:
+            source: Camera index, RTSP/HTTP URL or video file path
+            width: Capture width requested from local cameras
+            height: Capture height requested from local cameras
+            frame_pool: Optional FramePool to decode frames into
+            reconnect: Reopen after a failure (default: only for streams)
+            loop: Restart a video file when it ends
+            realtime: Play files at their native frame rate instead of as fast as they decode
+            initial_backoff: Seconds to wait before the first reconnect attempt
+            max_backoff: Upper bound for the reconnect delay
+        """
+        self.kind, self.value = parse_source(source)
+        self.width = width
+        self.height = height
+        self.frame_pool = frame_pool
+        self.reconnect = reconnect if reconnect is not None else self.kind == 'stream'
+        self.loop = loop
+        self.realtime = realtime
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+        self.cap = None
+        self.grabber = None
+        self.failed = False
+        self._backoff = initial_backoff
+        self._next_attempt = 0.0
+        self.reconnects = 0
+
+    @property
+    def name(self):
+        return f"camera {self.value}" if self.kind == 'device' else str(self.value)
+
+    @property
+    def is_live(self):
+        """Whether frames come from a live camera rather than a recording."""
+        return self.kind != 'file'
+
+    def open(self):
+        """
+        Open the capture and start the decoder thread.
+
+        Returns:
+            bool: True if the source opened
+        """
+        self.close()
+        self.cap = open_capture(self.kind, self.value, self.width, self.height)
+        if not self.cap.isOpened():
+            print(f"Error: Could not open {self.name}.")
+            self.cap.release()
+            self.cap = None
+            return False
+
+        pace_fps = None
+        if self.kind == 'file' and self.realtime:
+            pace_fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        self.grabber = FrameGrabber(self.cap, name=self.name, frame_pool=self.frame_pool,
+                                    pace_fps=pace_fps).start()
+        self.failed = False
+        return True
+
+    def _schedule_reconnect(self):
+        self._next_attempt = time.time() + self._backoff
+        print(f"{self.name} unavailable, retrying in {self._backoff:.0f}s")
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+
+    def read(self, timeout=1.0):
+        """
+        Return the newest decoded frame, reconnecting if the source dropped.
+
+        Ownership of the returned FrameHandle passes to the caller. While a
+        reconnect is pending this waits up to `timeout` and returns
+        (False, None) with `failed` still False.
+
+        Returns:
+            tuple: (ret, FrameHandle)
+        """
+        if self.failed:
+            return False, None
+
+        if self.grabber is None:
+            wait = self._next_attempt - time.time()
+            if wait > 0:
+                time.sleep(min(wait, timeout))
+                return False, None
+            if not self.open():
+                if self.reconnect:
+                    self._schedule_reconnect()
+                else:
+                    self.failed = True
+                return False, None
+
+        ret, handle = self.grabber.read(timeout)
+        if ret:
+            self._backoff = self.initial_backoff
+            return ret, handle
+
+        if self.grabber.failed:
+            self.close()
+            if self.kind == 'file' and self.loop:
+                self._next_attempt = 0.0
+            elif self.reconnect:
+                self.reconnects += 1
+                self._schedule_reconnect()
+            else:
+                self.failed = True
+        return False, None
+
+    def close(self):
+        """Stop the decoder thread and release the capture."""
+        if self.grabber is not None:
+            self.grabber.stop()
+            self.grabber = None
+        if self.cap is not None and self.cap.isOpened():
+            self.cap.release()
+        self.cap = None
+
+    def get_stats(self):
+        """Get decoder counters plus reconnect state."""
+        stats = self.grabber.get_stats() if self.grabber is not None else {}
+        stats.update({
+            'source': str(self.value),
+            'kind': self.kind,
+            'connected': self.grabber is not None,
+            'reconnects': self.reconnects,
+        })
+        return stats
@@ -1,34 +1,148 @@
 import cv2
 import numpy as np
-from ultralytics import YOLO
 import time
+import threading
+from vision.model_registry import get_model
+from vision.backends import load_vision_config, resolve_model_path
+from vision.room_config import RoomRegion, tile_grid
 from vision.iphone import initialize_camera, switch_camera, get_available_cameras
 
+# Colors for bounding boxes (BGR format)
+DEFAULT_COLORS = [
+    (0, 255, 0),    # Green
+    (255, 0, 0),    # Blue
+    (0, 0, 255),    # Red
+    (255, 255, 0),  # Cyan
+    (255, 0, 255),  # Magenta
+    (0, 255, 255),  # Yellow
+]
+
+
+def draw_person_boxes(frame, detections, colors=DEFAULT_COLORS):
+    """
+    Draw bounding boxes and confidence labels for a detection dict onto frame.
+    
+    Kept at module level so consumers that never load a model (process pool
+    clients, display-only views) can annotate frames too.
+    """
+    for i, ((x1, y1, x2, y2), confidence_value) in enumerate(
+            zip(detections['boxes'], detections['confidences'])):
+        # Choose color based on detection index
+        color = colors[i % len(colors)]
+        
+        # Draw bounding box
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        
+        # Draw label
+        label = f"Person: {confidence_value:.2f}"
+        cv2.putText(frame, label, (x1, y1 - 10), 
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    
+    return frame
+
+
+def make_tiles(frame_shape, rows, cols, overlap=0.2):
+    """
+    Split a frame into an overlapping grid of tiles.
+    
+    Args:
+        frame_shape: Shape of the frame (h, w, ...)
+        rows: Number of tile rows
+        cols: Number of tile columns
+        overlap: Fraction of a tile shared with its neighbour
+    
+    Returns:
+        list of (x0, y0, x1, y1) tile rectangles
+    """
+    h, w = frame_shape[:2]
+    tile_w = w / (cols - (cols - 1) * overlap)
+    tile_h = h / (rows - (rows - 1) * overlap)
+    tiles = []
+    for row in range(rows):
+        for col in range(cols):
+            x0 = int(round(col * tile_w * (1 - overlap)))
+            y0 = int(round(row * tile_h * (1 - overlap)))
+            x1 = min(w, int(round(x0 + tile_w)))
+            y1 = min(h, int(round(y0 + tile_h)))
+            tiles.append((x0, y0, x1, y1))
+    return tiles
+
+
+def merge_tile_detections(boxes, confidences, sources, iou_threshold=0.5, ios_threshold=0.85):
+    """
+    Cross-tile non-maximum suppression.
+    
+    A person on a tile border shows up in both tiles, often as one full and one
+    clipped box. Besides plain IoU, a box is suppressed when most of it lies
+    inside a higher-confidence box from another tile or the full-frame pass
+    (intersection over the smaller area). Boxes from the same tile already went
+    through the model's NMS; they are only merged on IoU, so a partly hidden
+    person inside someone else's box is kept.
+    
+    Args:
+        boxes: N x 4 xyxy boxes in frame coordinates
+        confidences: N confidences
+        sources: N ids of the tile (or full-frame pass) each box came from
+    
+    Returns:
+        np.ndarray: Indices of the boxes to keep
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=int)
+    boxes = boxes.astype(float)
+    sources = np.asarray(sources)
+    areas = np.maximum(boxes[:, 2] - boxes[:, 0], 0) * np.maximum(boxes[:, 3] - boxes[:, 1], 0)
+    order = np.argsort(-confidences)
+    keep = []
+    while len(order) > 0:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(boxes[best, 2], boxes[rest, 2]) - np.maximum(boxes[best, 0], boxes[rest, 0]), 0, None)
+        inter_h = np.clip(np.minimum(boxes[best, 3], boxes[rest, 3]) - np.maximum(boxes[best, 1], boxes[rest, 1]), 0, None)
+        intersection = inter_w * inter_h
+        iou = intersection / np.maximum(areas[best] + areas[rest] - intersection, 1e-9)
+        ios = intersection / np.maximum(np.minimum(areas[best], areas[rest]), 1e-9)
+        contained = (ios > ios_threshold) & (sources[rest] != sources[best])
+        order = rest[(iou <= iou_threshold) & ~contained]
+    return np.array(keep, dtype=int)
+
+
 class PeopleCounter:
-    def __init__(self, model_path='best.pt', confidence_threshold=0.5):
+    def __init__(self, model_path=None, confidence_threshold=0.5, backend=None, imgsz=None):
         """
         Initialize the people counter with YOLO model
         
         Args:
-            model_path: Path to YOLO model file (default: yolov8n.pt)
+            model_path: Path to YOLO model file (default: model_path from vision/config.json, best.pt)
             confidence_threshold: Minimum confidence for person detection
+            backend: 'torch', 'onnx' or 'openvino' (default: backend from vision/config.json)
+            imgsz: Inference image size (default: imgsz from vision/config.json)
         """
-        self.model = YOLO(model_path)
+        config = load_vision_config()
+        model_path = model_path or config['model_path']
+        self.backend = backend or config['backend']
+        self.imgsz = imgsz or config['imgsz']
+        self.default_imgsz = self.imgsz
+        
+        # Exported backends are loaded from their own files, exported on first use
+        resolved_path = resolve_model_path(model_path, self.backend, imgsz=self.imgsz)
+        settings = {} if self.backend == 'torch' else {'task': 'detect'}
+        
+        # Shared, already-warm handle: every counter on the same weights reuses it
+        self.model = get_model(resolved_path, **settings)
         self.confidence_threshold = confidence_threshold
         self.current_count = 0
         self.fps_counter = 0
         self.fps_start_time = time.time()
         self.fps = 0
+        self.last_detections = None
+        self.region = None  # RoomRegion applied by detect() when no region is passed
+        self.tiles = None   # (rows, cols, overlap) for sliced inference, None = whole frame
+        self.last_timings = {}  # seconds per stage of the last detect()/detect_batch(), per frame
         
         # Colors for bounding boxes (BGR format)
-        self.colors = [
-            (0, 255, 0),    # Green
-            (255, 0, 0),    # Blue
-            (0, 0, 255),    # Red
-            (255, 255, 0),  # Cyan
-            (255, 0, 255),  # Magenta
-            (0, 255, 255),  # Yellow
-        ]
+        self.colors = list(DEFAULT_COLORS)
     
     def calculate_fps(self):
         """Calculate and update FPS"""
@@ -40,46 +154,298 @@ class PeopleCounter:
     
     def count_persons(self, detections):
         """Count persons in current frame"""
-        person_count = 0
-        
-        for detection in detections:
-            if detection.conf > self.confidence_threshold and detection.cls == 0:  # Class 0 is person
-                person_count += 1
+        person_count = int(self.person_mask(self.boxes_to_numpy(detections)).sum())
         
         self.current_count = person_count
         return person_count
     
-    def detect_and_count(self, frame, current_camera=None, available_cameras=None):
-        """Detect people in frame and return annotated frame"""
-        # Run YOLO detection
-        results = self.model(frame, verbose=False)
+    @staticmethod
+    def boxes_to_numpy(detections):
+        """
+        Copy a YOLO Boxes object to the host in a single transfer.
+        
+        Returns:
+            np.ndarray of shape (N, 6+) with columns x1, y1, x2, y2, [track id,] conf, cls
+        """
+        if detections is None or len(detections) == 0:
+            return np.empty((0, 6), dtype=np.float32)
+        data = detections.data
+        return data.cpu().numpy() if hasattr(data, 'cpu') else np.asarray(data)
+    
+    def person_mask(self, data):
+        """Boolean mask of rows in a boxes array that are confident person detections"""
+        # conf and cls are always the last two columns, with or without track ids
+        return (data[:, -2] > self.confidence_threshold) & (data[:, -1] == 0)  # Class 0 is person
+    
+    def extract_persons(self, result):
+        """
+        Pull the person detections out of a single YOLO result.
         
-        # Get detections
-        detections = results[0].boxes if len(results) > 0 and results[0].boxes is not None else []
+        Args:
+            result: One ultralytics Results object
         
-        # Count persons
-        person_count = self.count_persons(detections)
+        Returns:
+            dict with 'count', 'boxes' (N x 4 int xyxy) and 'confidences' (N floats)
+        """
+        data = self.boxes_to_numpy(result.boxes if result is not None else None)
+        persons = data[self.person_mask(data)]
         
-        # Draw bounding boxes and labels
-        for i, detection in enumerate(detections):
-            if detection.conf > self.confidence_threshold and detection.cls == 0:
-                x1, y1, x2, y2 = detection.xyxy[0].cpu().numpy().astype(int)
-                confidence = detection.conf.cpu().numpy()
-                
-                # Choose color based on detection index
-                color = self.colors[i % len(self.colors)]
-                
-                # Draw bounding box
-                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                
-                # Draw label
-                confidence_value = float(confidence.item()) if hasattr(confidence, 'item') else float(confidence)
-                label = f"Person: {confidence_value:.2f}"
-                cv2.putText(frame, label, (x1, y1 - 10), 
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        return {
+            'count': len(persons),
+            'boxes': persons[:, :4].astype(int),
+            'confidences': persons[:, -2].astype(float),
+        }
+    
+    def inference_size(self, imgsz=None):
+        """Image size for a forward pass; exported models are fixed to their export size"""
+        if imgsz and self.backend == 'torch':
+            return imgsz
+        return self.imgsz
+    
+    def set_room(self, room_settings):
+        """
+        Apply per-room settings (see vision.room_config.get_room_settings).
+        
+        Args:
+            room_settings: dict with optional 'imgsz', 'roi', 'tiles' and 'tile_overlap' entries
+        """
+        self.region = RoomRegion.from_settings(room_settings)
+        self.tiles = tile_grid(room_settings)
+        self.imgsz = self.default_imgsz
+        if room_settings.get('imgsz'):
+            self.imgsz = self.inference_size(room_settings['imgsz'])
+    
+    @staticmethod
+    def stage_timings(start, model_start, model_end, end, results=None, frames=1, images=None):
+        """
+        Split one detection pass into preprocess / inference / postprocess seconds per frame.
+        
+        Our own ROI cropping and filtering are timed around the model call;
+        ultralytics reports its letterbox and NMS time in Results.speed (ms per
+        image), which is moved out of the model call into the matching stage.
+        `images` is the number of images the model saw (tiles count separately),
+        defaulting to one per frame.
+        """
+        preprocess = model_start - start
+        inference = model_end - model_start
+        postprocess = end - model_end
+        images = images if images is not None else frames
+        speed = getattr(results[0], 'speed', None) if results else None
+        if speed:
+            model_pre = (speed.get('preprocess') or 0.0) / 1000.0 * images
+            model_post = (speed.get('postprocess') or 0.0) / 1000.0 * images
+            if model_pre + model_post <= inference:
+                preprocess += model_pre
+                postprocess += model_post
+                inference -= model_pre + model_post
+        return {
+            'preprocess': preprocess / frames,
+            'inference': inference / frames,
+            'postprocess': postprocess / frames,
+        }
+    
+    def detect_batch(self, frames, regions=None, tiles=None, imgsz=None):
+        """
+        Run one batched YOLO forward pass over several frames.
+        
+        Frames of tiled rooms go through detect_tiled() instead, each as its
+        own batch of tiles, so a room is counted the same way whichever path
+        submitted it.
+        
+        Args:
+            frames: List of BGR frames, typically the latest frame of each camera
+            regions: Optional list of RoomRegion (or None) per frame
+            tiles: Optional list of (rows, cols, overlap) (or None) per frame
+            imgsz: Inference image size for the whole batch (defaults to the room's)
+        
+        Returns:
+            list of detection dicts (see extract_persons), one per input frame
+        """
+        if not frames:
+            return []
+        
+        start = time.perf_counter()
+        imgsz = self.inference_size(imgsz)
+        regions = regions if regions is not None else [None] * len(frames)
+        tiles = tiles if tiles is not None else [None] * len(frames)
+        inputs = []
+        offsets = []
+        for frame, region in zip(frames, regions):
+            if region is not None:
+                crop, offset = region.crop(frame)
+                inputs.append(crop)
+                offsets.append(offset)
+            else:
+                inputs.append(frame)
+                offsets.append(None)
+        
+        model_start = time.perf_counter()
+        batch = [None] * len(frames)
+        all_results = []
+        whole = [i for i, grid in enumerate(tiles) if not grid]
+        if whole:
+            results = self.model([inputs[i] for i in whole], imgsz=imgsz, verbose=False)
+            for i, result in zip(whole, results):
+                batch[i] = self.extract_persons(result)
+            all_results.extend(results)
+        for i, grid in enumerate(tiles):
+            if grid:
+                rows, cols, overlap = grid
+                batch[i], results = self._detect_tiled(inputs[i], rows, cols, overlap, imgsz)
+                all_results.extend(results)
+        model_end = time.perf_counter()
+        batch = [region.restore(detections, offset) if region is not None else detections
+                 for detections, region, offset in zip(batch, regions, offsets)]
+        self.last_timings = self.stage_timings(start, model_start, model_end, time.perf_counter(),
+                                               all_results, len(frames), len(all_results))
+        
+        for _ in frames:
+            self.calculate_fps()
+        
+        return batch
+    
+    def detect_tiled(self, frame, rows, cols, overlap=0.2, imgsz=None, include_full_frame=True):
+        """
+        Sliced inference for large rooms where people at the back are tiny.
+        
+        Overlapping tiles are cut from the frame (as views, no copies) and sent
+        to the model as one batch, so every tile is processed in parallel in a
+        single forward pass. A downscaled full-frame pass is included by default
+        for people close to the camera who span several tiles. Boxes are mapped
+        back to frame coordinates and merged with cross-tile NMS.
+        
+        Args:
+            frame: BGR frame
+            rows: Number of tile rows
+            cols: Number of tile columns
+            overlap: Fraction of overlap between neighbouring tiles
+            imgsz: Inference image size per tile
+            include_full_frame: Also run the whole frame as part of the batch
+        
+        Returns:
+            dict with 'count', 'boxes' and 'confidences' (see extract_persons)
+        """
+        return self._detect_tiled(frame, rows, cols, overlap, imgsz, include_full_frame)[0]
+    
+    def _detect_tiled(self, frame, rows, cols, overlap=0.2, imgsz=None, include_full_frame=True):
+        """detect_tiled() that also returns the model's Results (for their speed figures)"""
+        rects = make_tiles(frame.shape, rows, cols, overlap)
+        inputs = [frame[y0:y1, x0:x1] for x0, y0, x1, y1 in rects]
+        offsets = [(x0, y0) for x0, y0, _, _ in rects]
+        if include_full_frame:
+            inputs.append(frame)
+            offsets.append((0, 0))
+        
+        results = self.model(inputs, imgsz=self.inference_size(imgsz), verbose=False)
+        
+        all_boxes = []
+        all_confidences = []
+        all_sources = []
+        for source, (result, (dx, dy)) in enumerate(zip(results, offsets)):
+            detections = self.extract_persons(result)
+            all_boxes.append(detections['boxes'] + np.array([dx, dy, dx, dy]))
+            all_confidences.append(detections['confidences'])
+            all_sources.append(np.full(detections['count'], source))
+        
+        boxes = np.concatenate(all_boxes).reshape(-1, 4)
+        confidences = np.concatenate(all_confidences)
+        keep = merge_tile_detections(boxes, confidences, np.concatenate(all_sources))
+        detections = {
+            'count': len(keep),
+            'boxes': boxes[keep],
+            'confidences': confidences[keep],
+        }
+        return detections, results
+    
+    def draw_detections(self, frame, detections):
+        """Draw bounding boxes and confidence labels for a detection dict onto frame"""
+        return draw_person_boxes(frame, detections, self.colors)
+    
+    def detect(self, frame, region=None, imgsz=None, tiles=None):
+        """
+        Detect and count people without touching the frame's pixels.
+        
+        Args:
+            frame: BGR frame
+            region: RoomRegion to restrict detection to (default: self.region)
+            imgsz: Inference image size override (default: self.imgsz)
+            tiles: (rows, cols, overlap) for sliced inference (default: self.tiles)
+        
+        Returns:
+            dict with 'count', 'boxes' and 'confidences' (see extract_persons)
+        """
+        start = time.perf_counter()
+        region = region if region is not None else self.region
+        model_input, offset = region.crop(frame) if region is not None else (frame, None)
+        
+        tiles = tiles if tiles is not None else self.tiles
+        
+        model_start = time.perf_counter()
+        if tiles:
+            rows, cols, overlap = tiles
+            detections, results = self._detect_tiled(model_input, rows, cols, overlap, imgsz)
+            model_end = time.perf_counter()
+        else:
+            # Run YOLO detection
+            results = self.model(model_input, imgsz=self.inference_size(imgsz), verbose=False)
+            model_end = time.perf_counter()
+            
+            # Filter and count persons in one pass over the result tensor
+            detections = self.extract_persons(results[0] if len(results) > 0 else None)
+        
+        if region is not None:
+            detections = region.restore(detections, offset)
+        self.last_timings = self.stage_timings(start, model_start, model_end, time.perf_counter(), results,
+                                               images=len(results) if results else 1)
+        self.current_count = detections['count']
+        self.last_detections = detections
         
         # Calculate FPS
         self.calculate_fps()
         
+        return detections
+    
+    def annotate(self, frame, detections=None):
+        """
+        Lazily draw detections for a display consumer.
+        
+        Args:
+            frame: BGR frame to draw on (modified in place)
+            detections: Detection dict to draw (defaults to the most recent detect() result)
+        
+        Returns:
+            The annotated frame
+        """
+        if detections is None:
+            detections = self.last_detections
+        if detections is None:
+            return frame
+        return self.draw_detections(frame, detections)
+    
+    def detect_and_count(self, frame, current_camera=None, available_cameras=None, annotate=True):
+        """
+        Detect people in frame and return annotated frame
+        
+        Args:
+            frame: BGR frame
+            annotate: When False, run in counting-only mode and leave the frame untouched
+        """
+        detections = self.detect(frame)
+        
+        # Draw bounding boxes and labels
+        if annotate:
+            self.draw_detections(frame, detections)
+        
         return frame
 
+
+def preload_people_counter(**counter_args):
+    """
+    Load and warm the configured model in a background thread.
+    
+    The model registry keeps it, so the first PeopleCounter built afterwards
+    (e.g. when the camera page starts) gets it without waiting.
+    """
+    thread = threading.Thread(target=PeopleCounter, kwargs=counter_args, daemon=True)
+    thread.start()
+    return thread